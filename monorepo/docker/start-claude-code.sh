@@ -28,6 +28,10 @@ fi
 
 echo "SuperClaude setup complete. Starting SuperClaude..."
 
+# Start the hook daemon so hooks run in a warm process
+echo "Starting hook daemon..."
+uv run /app/.claude/hooks/hookd.py &
+
 # Start a simple HTTP server to keep container running
 echo "Starting HTTP server on port 8002..."
 cd /app/claude-code
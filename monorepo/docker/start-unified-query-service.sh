@@ -54,5 +54,8 @@ cd /app/unified-query-service
 exec uvicorn src.main:app \
   --host 0.0.0.0 \
   --port $SERVICE_PORT \
-  --workers 1 \
+  --workers ${WORKERS:-1} \
+  --loop uvloop \
+  --http httptools \
+  --no-access-log \
   --log-level info
\ No newline at end of file
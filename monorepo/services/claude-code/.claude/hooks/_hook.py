@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Shared entry point for the hook scripts.
+
+Every hook module exposes `handle(payload, raw) -> (status, message)`, where
+`raw` holds the payload bytes exactly as received. A hook process first
+forwards its raw stdin payload to the hookd daemon, which runs the handler in
+a warm, long-lived process; when the daemon isn't reachable the handler runs
+inline instead. This module can also be invoked directly as
+`_hook.py <hook_name>` to dispatch to any hook module by name.
+"""
+
+import importlib
+import os
+import socket
+import sys
+
+from _logclient import RUNTIME_DIR
+
+# Hooks run under `python3 -S`, where orjson may not be importable
+try:
+    from orjson import JSONDecodeError, loads
+except ImportError:
+    from json import JSONDecodeError, loads
+
+HOOKS = (
+    "notification",
+    "post_tool_use",
+    "pre_compact",
+    "pre_tool_use",
+    "session_start",
+    "stop",
+    "subagent_stop",
+    "user_prompt_submit"
+)
+
+DISPATCH_SOCK_PATH = f"{RUNTIME_DIR}/hooks-dispatch.sock"
+
+# How long connecting and sending to hookd may take before the hook runs inline
+DISPATCH_TIMEOUT = 0.05
+
+# How long to wait for hookd's result once it has the request; the hook can't
+# fall back to running inline then, or the handler would run twice
+REPLY_TIMEOUT = 30.0
+
+# Largest request forwarded to hookd; bigger payloads are handled inline
+MAX_PACKET = 256 * 1024
+
+
+def load_handler(name):
+    """Import a hook module by name and return its handler"""
+    return importlib.import_module(name).handle
+
+
+def read_stdin():
+    """Read the raw JSON payload from stdin"""
+    raw = sys.stdin.buffer.read()
+    if not raw:
+        print("No JSON payload received", file=sys.stderr)
+        sys.exit(1)
+    
+    return raw
+
+
+def handle_raw(handle, raw):
+    """Parse a raw payload and run a hook handler on it"""
+    try:
+        payload = loads(raw)
+    except JSONDecodeError as e:
+        return 1, f"Failed to parse JSON: {e}"
+    
+    return handle(payload, raw)
+
+
+def forward(name, raw):
+    """Run a hook in hookd, returning None if the daemon can't take it"""
+    request = name.encode() + b"\0" + raw
+    if len(request) > MAX_PACKET:
+        return None
+    
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_SEQPACKET)
+    try:
+        sock.settimeout(DISPATCH_TIMEOUT)
+        try:
+            sock.connect(DISPATCH_SOCK_PATH)
+            sock.send(request)
+        except OSError:
+            # No daemon, stale socket or a stalled daemon: run inline
+            return None
+        
+        # hookd has the request and runs the handler, so wait for its result
+        sock.settimeout(REPLY_TIMEOUT)
+        try:
+            reply = sock.recv(MAX_PACKET)
+        except OSError as e:
+            return 1, f"hookd did not reply: {e}"
+    finally:
+        sock.close()
+    
+    if not reply:
+        return 1, "hookd closed the connection without a result"
+    return reply[0], reply[1:].decode()
+
+
+def report(status, message):
+    """Print a hook result and exit with its status"""
+    if status:
+        print(message, file=sys.stderr)
+        sys.exit(status)
+    print(message)
+
+
+def run(handle):
+    """Run a hook handler against the stdin payload and report its result"""
+    name = os.path.splitext(os.path.basename(sys.modules[handle.__module__].__file__))[0]
+    raw = read_stdin()
+    report(*(forward(name, raw) or handle_raw(handle, raw)))
+
+
+def main():
+    if len(sys.argv) < 2 or sys.argv[1] not in HOOKS:
+        print(f"Usage: _hook.py <{'|'.join(HOOKS)}>", file=sys.stderr)
+        sys.exit(1)
+    
+    run(load_handler(sys.argv[1]))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Hook log client: ship one JSONL entry to the hookd log daemon.
+
+Each hook sends its encoded entry as a single datagram to hookd, which
+coalesces entries into batched appends. When the daemon isn't running
+(or the entry is too large for one datagram) the line is appended to the
+log file directly. Handlers running inside hookd log through a sink that
+hands entries straight to the daemon's writer.
+"""
+
+import os
+import socket
+import time
+
+# Hooks run under `python3 -S`, where orjson may not be importable
+try:
+    import orjson
+
+    def encode(obj):
+        """Encode an object as compact JSON bytes"""
+        return orjson.dumps(obj)
+except ImportError:
+    import json
+
+    def encode(obj):
+        """Encode an object as compact JSON bytes"""
+        return json.dumps(obj, separators=(",", ":")).encode()
+
+LOG_DIR = "/app/logs"
+LOG_PATH = f"{LOG_DIR}/hooks.jsonl"
+
+# Both hookd sockets (log and dispatch) live here, beside the log: hookd
+# already creates this directory and the container user can write to it,
+# which isn't true of /run
+RUNTIME_DIR = LOG_DIR
+SOCK_PATH = f"{RUNTIME_DIR}/hooks.sock"
+
+# Largest entry sent over the socket; hookd reads datagrams with this size
+MAX_DATAGRAM = 64 * 1024
+
+# Log fd for direct appends, opened on first use and kept for the process
+_log_fd = None
+
+# In-process receiver for encoded lines, installed by hookd
+_sink = None
+
+
+def set_sink(sink):
+    """Route encoded log lines to `sink(line)` instead of the socket"""
+    global _sink
+    _sink = sink
+
+
+def _append(line):
+    """Append a line directly to the log file with a single write()"""
+    global _log_fd
+    if _log_fd is None:
+        flags = os.O_WRONLY | os.O_APPEND | os.O_CREAT
+        try:
+            _log_fd = os.open(LOG_PATH, flags, 0o644)
+        except FileNotFoundError:
+            # The image creates the log directory; only make it when missing
+            os.makedirs(LOG_DIR, exist_ok=True)
+            _log_fd = os.open(LOG_PATH, flags, 0o644)
+    # O_APPEND writes of a single line land atomically, so no locking is needed
+    os.write(_log_fd, line)
+
+
+def _send(line):
+    """Hand an encoded line to hookd, falling back to a direct append"""
+    if _sink is not None:
+        _sink(line)
+        return
+
+    if len(line) > MAX_DATAGRAM:
+        _append(line)
+        return
+
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM | socket.SOCK_NONBLOCK)
+    try:
+        sock.sendto(line, SOCK_PATH)
+    except OSError:
+        # No daemon (ENOENT/ECONNREFUSED) or its queue is full (EAGAIN)
+        _append(line)
+    finally:
+        sock.close()
+
+
+def emit(entry):
+    """Log an entry through hookd, falling back to a direct append"""
+    _send(encode(entry) + b"\n")
+
+
+def emit_payload(hook, payload, raw):
+    """
+    Log a hook's stdin payload under "payload".
+
+    The raw bytes are already validated JSON, so they are spliced into the
+    line as received instead of re-encoding the parsed payload. Payloads
+    spread over several lines are re-encoded to keep one entry per line.
+    """
+    raw = raw.strip()
+    if b"\n" in raw or b"\r" in raw:
+        raw = encode(payload)
+    _send(b'{"ts_ns":%d,"hook":"%s","payload":%s}\n' % (time.time_ns(), hook.encode(), raw))
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+# /// script
+# requires-python = ">=3.8"
+# dependencies = ["orjson"]
+# ///
+
+"""
+Hook daemon: run hook handlers in one long-lived process and batch their
+log output into /app/logs/hooks.jsonl.
+
+hookd listens on two UNIX sockets:
+- a SOCK_SEQPACKET dispatch socket, where each hook process forwards its
+  hook name and raw stdin payload and gets back an exit status and message;
+- a SOCK_DGRAM log socket, where hooks that ran inline send their entries.
+
+Handlers, parsed modules and the log fd stay warm across events. Log lines
+from both sources are coalesced in memory and appended with a single write()
+once 64 KiB are pending or 10 ms after the first pending line, so bursts of
+hook events cost one write. The log is opened with O_DSYNC, so each batch is
+on disk once its write returns.
+"""
+
+import asyncio
+import os
+import signal
+import socket
+import sys
+
+import _logclient
+from _hook import DISPATCH_SOCK_PATH, HOOKS, MAX_PACKET, handle_raw, load_handler
+from _logclient import LOG_PATH, MAX_DATAGRAM, RUNTIME_DIR, SOCK_PATH
+
+# Flush once this many bytes are pending, or FLUSH_DELAY seconds after the
+# first pending line, whichever comes first
+FLUSH_SIZE = 64 * 1024
+FLUSH_DELAY = 0.01
+
+
+class LogWriter:
+    """Collects log lines and appends them to the log in batches"""
+    
+    def __init__(self, loop, log_path=LOG_PATH):
+        self.loop = loop
+        # O_DSYNC makes every batch durable when write() returns, without
+        # a separate fsync() per write
+        self.fd = os.open(
+            log_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT | os.O_DSYNC, 0o644
+        )
+        self.pending = bytearray()
+        self.flush_handle = None
+    
+    def append(self, line):
+        """Queue a line, flushing when the batch is full or its timer fires"""
+        # Everything runs on the event loop thread, so no locking is needed
+        self.pending += line
+        if len(self.pending) >= FLUSH_SIZE:
+            self.flush()
+        elif self.flush_handle is None:
+            self.flush_handle = self.loop.call_later(FLUSH_DELAY, self.flush)
+    
+    def flush(self):
+        """Append all pending lines with a single write"""
+        if self.flush_handle is not None:
+            self.flush_handle.cancel()
+            self.flush_handle = None
+        if self.pending:
+            os.write(self.fd, self.pending)
+            # clear() also releases the memory of an oversized batch
+            self.pending.clear()
+    
+    def close(self):
+        self.flush()
+        os.close(self.fd)
+
+
+def bind_socket(path, kind):
+    """Bind a non-blocking UNIX socket, replacing any stale socket file"""
+    if os.path.exists(path):
+        os.unlink(path)
+    sock = socket.socket(socket.AF_UNIX, kind)
+    sock.bind(path)
+    sock.setblocking(False)
+    return sock
+
+
+def drain_log_socket(sock, writer):
+    """Move every pending log datagram into the writer"""
+    try:
+        while True:
+            writer.append(sock.recv(MAX_DATAGRAM))
+    except BlockingIOError:
+        pass
+
+
+async def dispatch(conn, handlers):
+    """Run the hook requested on a dispatch connection and send its result"""
+    loop = asyncio.get_running_loop()
+    with conn:
+        request = await loop.sock_recv(conn, MAX_PACKET)
+        name, _, raw = request.partition(b"\0")
+        handle = handlers.get(name.decode())
+        if handle is None:
+            return
+        
+        status, message = handle_raw(handle, raw)
+        await loop.sock_sendall(conn, bytes([status]) + message.encode())
+
+
+async def serve(dispatch_path=DISPATCH_SOCK_PATH, sock_path=SOCK_PATH, log_path=LOG_PATH):
+    """Serve hook dispatch and log sockets until cancelled"""
+    loop = asyncio.get_running_loop()
+    # Stop cleanly on SIGTERM so pending log lines get flushed
+    loop.add_signal_handler(signal.SIGTERM, asyncio.current_task().cancel)
+    os.makedirs(RUNTIME_DIR, exist_ok=True)
+    writer = LogWriter(loop, log_path)
+    _logclient.set_sink(writer.append)
+    handlers = {name: load_handler(name) for name in HOOKS}
+    
+    log_sock = bind_socket(sock_path, socket.SOCK_DGRAM)
+    loop.add_reader(log_sock.fileno(), drain_log_socket, log_sock, writer)
+    
+    dispatch_sock = bind_socket(dispatch_path, socket.SOCK_SEQPACKET)
+    dispatch_sock.listen(128)
+    print(f"hookd listening on {dispatch_path} and {sock_path}, writing {log_path}")
+    
+    tasks = set()
+    try:
+        while True:
+            conn, _ = await loop.sock_accept(dispatch_sock)
+            task = loop.create_task(dispatch(conn, handlers))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+    finally:
+        loop.remove_reader(log_sock.fileno())
+        for sock, path in ((log_sock, sock_path), (dispatch_sock, dispatch_path)):
+            sock.close()
+            os.unlink(path)
+        writer.close()
+
+
+def main():
+    try:
+        asyncio.run(serve())
+    except (KeyboardInterrupt, asyncio.CancelledError):
+        sys.exit(0)
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,8 @@
 #!/usr/bin/env python3
-# /// script
-# requires-python = ">=3.8"
-# dependencies = []
-# ///
+import re
 
-import json
-import os
-import sys
-from datetime import datetime
+from _hook import run
+from _logclient import emit_payload
 
 # Dangerous commands and patterns to block
 DANGEROUS_COMMANDS = [
@@ -27,59 +22,46 @@ BLOCKED_FILES = [
     ".gitconfig"
 ]
 
+# Match every pattern of a kind in a single scan of the input, folding
+# ASCII case while matching so the input is never lowercased
+DANGEROUS_COMMANDS_RE = re.compile(
+    "|".join(re.escape(p) for p in DANGEROUS_COMMANDS), re.IGNORECASE | re.ASCII
+)
+BLOCKED_FILES_RE = re.compile(
+    "|".join(re.escape(p) for p in BLOCKED_FILES), re.IGNORECASE | re.ASCII
+)
+
 def is_dangerous(tool_name, tool_input):
     """Check if the tool usage is potentially dangerous"""
     if tool_name == "Bash":
-        command = tool_input.get("command", "").lower()
-        for dangerous in DANGEROUS_COMMANDS:
-            if dangerous in command:
-                return True, f"Blocked dangerous command: {dangerous}"
+        match = DANGEROUS_COMMANDS_RE.search(tool_input.get("command", ""))
+        if match:
+            return True, f"Blocked dangerous command: {match.group().lower()}"
     
     if tool_name in ["Read", "Write", "Edit"]:
-        file_path = tool_input.get("file_path", "").lower()
-        for blocked in BLOCKED_FILES:
-            if blocked in file_path:
-                return True, f"Blocked access to sensitive file: {blocked}"
+        match = BLOCKED_FILES_RE.search(tool_input.get("file_path", ""))
+        if match:
+            return True, f"Blocked access to sensitive file: {match.group().lower()}"
     
     return False, ""
 
-def main():
-    # Read the JSON payload from stdin
-    if sys.stdin.isatty():
-        print("No JSON payload received", file=sys.stderr)
-        sys.exit(1)
-    
-    try:
-        payload = json.loads(sys.stdin.read())
-    except json.JSONDecodeError as e:
-        print(f"Failed to parse JSON: {e}", file=sys.stderr)
-        sys.exit(1)
-    
+def handle(payload, raw):
     # Extract tool info
     tool_name = payload.get("tool_name", "")
     tool_input = payload.get("tool_input", {})
     
     # Log the tool use
-    log_dir = "/app/logs"
-    os.makedirs(log_dir, exist_ok=True)
-    
-    log_entry = {
-        "timestamp": datetime.now().isoformat(),
-        "hook": "PreToolUse",
-        "tool_name": tool_name,
-        "tool_input": tool_input
-    }
-    
-    with open(f"{log_dir}/hooks.jsonl", "a") as f:
-        f.write(json.dumps(log_entry) + "\n")
+    emit_payload("PreToolUse", payload, raw)
     
     # Check for dangerous operations
     is_blocked, reason = is_dangerous(tool_name, tool_input)
     if is_blocked:
-        print(f"BLOCKED: {reason}", file=sys.stderr)
-        sys.exit(1)
+        return 1, f"BLOCKED: {reason}"
     
-    print(f"Allowed tool use: {tool_name}")
+    return 0, f"Allowed tool use: {tool_name}"
+
+def main():
+    run(handle)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
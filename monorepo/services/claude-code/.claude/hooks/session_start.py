@@ -1,45 +1,19 @@
 #!/usr/bin/env python3
-# /// script
-# requires-python = ">=3.8"
-# dependencies = []
-# ///
+from _hook import run
+from _logclient import emit_payload
 
-import json
-import os
-import sys
-from datetime import datetime
-
-def main():
-    # Read the JSON payload from stdin
-    if sys.stdin.isatty():
-        print("No JSON payload received", file=sys.stderr)
-        sys.exit(1)
-    
-    try:
-        payload = json.loads(sys.stdin.read())
-    except json.JSONDecodeError as e:
-        print(f"Failed to parse JSON: {e}", file=sys.stderr)
-        sys.exit(1)
-    
+def handle(payload, raw):
     # Extract session info
     source = payload.get("source", "")
     session_id = payload.get("session_id", "")
     
     # Log session start
-    log_dir = "/app/logs"
-    os.makedirs(log_dir, exist_ok=True)
+    emit_payload("SessionStart", payload, raw)
     
-    log_entry = {
-        "timestamp": datetime.now().isoformat(),
-        "hook": "SessionStart",
-        "source": source,
-        "session_id": session_id
-    }
-    
-    with open(f"{log_dir}/hooks.jsonl", "a") as f:
-        f.write(json.dumps(log_entry) + "\n")
-    
-    print(f"Session started: {source} ({session_id})")
+    return 0, f"Session started: {source} ({session_id})"
+
+def main():
+    run(handle)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -1,7 +1,7 @@
 #!/usr/bin/env python3
 import os
+import signal
 import sys
-import time
 
 print("GenAI Stack starting...")
 print(f"Python: {sys.version}")
@@ -9,26 +9,20 @@ print(f"Working directory: {os.getcwd()}")
 
 # Test imports
 print("\nTesting imports...")
-try:
-    import streamlit
-    print("✓ Streamlit imported")
-except:
-    print("✗ Streamlit import failed")
-
-try:
-    import neo4j
-    print("✓ Neo4j imported")
-except:
-    print("✗ Neo4j import failed")
-
-try:
-    import langchain_neo4j
-    print("✓ LangChain Neo4j imported")
-except:
-    print("✗ LangChain Neo4j import failed")
+for module, label in (
+    ("streamlit", "Streamlit"),
+    ("neo4j", "Neo4j"),
+    ("langchain_neo4j", "LangChain Neo4j"),
+):
+    try:
+        __import__(module)
+        print(f"✓ {label} imported")
+    except Exception:
+        print(f"✗ {label} import failed")
 
 # Keep container running for debugging
-print("\nContainer is running. Check imports above.")
-while True:
-    time.sleep(60)
-    print(".", end="", flush=True)
\ No newline at end of file
+print("\nContainer is running. Check imports above.", flush=True)
+
+# As PID 1 the process ignores SIGTERM unless it installs a handler
+signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+signal.pause()
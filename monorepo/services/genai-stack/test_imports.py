@@ -4,20 +4,9 @@ print("Python version:", sys.version)
 print("Python executable:", sys.executable)
 print("Python path:", sys.path)
 
-try:
-    import langchain_neo4j
-    print("✓ langchain_neo4j imported successfully")
-except ImportError as e:
-    print("✗ Failed to import langchain_neo4j:", e)
-
-try:
-    import neo4j
-    print("✓ neo4j imported successfully")
-except ImportError as e:
-    print("✗ Failed to import neo4j:", e)
-
-try:
-    import streamlit
-    print("✓ streamlit imported successfully")
-except ImportError as e:
-    print("✗ Failed to import streamlit:", e)
\ No newline at end of file
+for module in ("langchain_neo4j", "neo4j", "streamlit"):
+    try:
+        __import__(module)
+        print(f"✓ {module} imported successfully")
+    except ImportError as e:
+        print(f"✗ Failed to import {module}:", e)
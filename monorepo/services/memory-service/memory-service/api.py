@@ -3,59 +3,110 @@
 Simple API server for Memory Service health checks
 """
 
-from http.server import HTTPServer, BaseHTTPRequestHandler
-import json
 import os
 import asyncio
+from contextlib import suppress
+
+import orjson
+import uvloop
+from aiohttp import web
 from memory_integration import MemoryIntegrationService
 
-class HealthCheckHandler(BaseHTTPRequestHandler):
-    def do_GET(self):
-        if self.path == '/health':
-            self.send_response(200)
-            self.send_header('Content-type', 'application/json')
-            self.end_headers()
-            
-            status = {
-                "status": "healthy",
-                "service": "Memory Integration Service",
-                "components": {
-                    "cognee": "ready",
-                    "memento-mcp": "ready",
-                    "neo4j": "connected"
-                }
-            }
-            
-            self.wfile.write(json.dumps(status).encode())
-        elif self.path == '/':
-            self.send_response(200)
-            self.send_header('Content-type', 'text/html')
-            self.end_headers()
-            
-            html = """
-            <html>
-            <head><title>Memory Service</title></head>
-            <body>
-                <h1>Memory Integration Service</h1>
-                <p>Combining Cognee and Memento MCP for AI memory</p>
-                <ul>
-                    <li><a href="/health">Health Check</a></li>
-                    <li>Neo4j Browser: <a href="http://localhost:7474">http://localhost:7474</a></li>
-                </ul>
-            </body>
-            </html>
-            """
-            
-            self.wfile.write(html.encode())
-        else:
-            self.send_response(404)
-            self.end_headers()
+SERVICE = web.AppKey("service", MemoryIntegrationService)
+
+# Seconds between background Neo4j checks; /health serves the last result
+NEO4J_CHECK_INTERVAL = 10
+
+# Static responses, serialized once at import
+STATUS_BYTES = orjson.dumps({
+    "status": "healthy",
+    "service": "Memory Integration Service",
+    "components": {
+        "cognee": "ready",
+        "memento-mcp": "ready",
+        "neo4j": "connected"
+    }
+})
+
+DEGRADED_BYTES = orjson.dumps({
+    "status": "degraded",
+    "service": "Memory Integration Service",
+    "components": {
+        "cognee": "ready",
+        "memento-mcp": "ready",
+        "neo4j": "disconnected"
+    }
+})
+
+INDEX_BYTES = b"""
+<html>
+<head><title>Memory Service</title></head>
+<body>
+    <h1>Memory Integration Service</h1>
+    <p>Combining Cognee and Memento MCP for AI memory</p>
+    <ul>
+        <li><a href="/health">Health Check</a></li>
+        <li><a href="/graph">Knowledge Graph (JSON lines)</a></li>
+        <li>Neo4j Browser: <a href="http://localhost:7474">http://localhost:7474</a></li>
+    </ul>
+</body>
+</html>
+"""
+
+async def health(request):
+    body = STATUS_BYTES if request.app[SERVICE].neo4j_connected else DEGRADED_BYTES
+    return web.Response(body=body, content_type='application/json')
+
+async def index(request):
+    return web.Response(body=INDEX_BYTES, content_type='text/html')
+
+async def graph(request):
+    """Stream the knowledge graph as JSON lines as Neo4j returns it"""
+    response = web.StreamResponse()
+    response.content_type = 'application/x-ndjson'
+    await response.prepare(request)
+    
+    async for line in request.app[SERVICE].stream_knowledge_graph():
+        await response.write(line)
+    
+    await response.write_eof()
+    return response
+
+async def watch_neo4j(service):
+    """Refresh the service's Neo4j flag so /health never waits on Neo4j"""
+    while True:
+        service.neo4j_connected = await service.neo4j_available()
+        await asyncio.sleep(NEO4J_CHECK_INTERVAL)
+
+async def memory_service(app):
+    """Run the memory service on the server's event loop for the app's lifetime"""
+    # Only the driver is created here: initialize() would prune Cognee's data
+    # on every restart, and Neo4j being down must not stop /health serving
+    service = MemoryIntegrationService()
+    try:
+        service.connect()
+    except Exception as e:
+        print(f"Neo4j driver unavailable, serving degraded: {e}")
+    app[SERVICE] = service
+    watcher = asyncio.create_task(watch_neo4j(service))
+    yield
+    watcher.cancel()
+    with suppress(asyncio.CancelledError):
+        await watcher
+    await service.close()
+
+def create_app():
+    app = web.Application()
+    app.cleanup_ctx.append(memory_service)
+    app.router.add_get('/health', health)
+    app.router.add_get('/', index)
+    app.router.add_get('/graph', graph)
+    return app
 
 def run_server(port=8500):
-    server_address = ('', port)
-    httpd = HTTPServer(server_address, HealthCheckHandler)
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
     print(f"Memory Service API running on port {port}")
-    httpd.serve_forever()
+    web.run_app(create_app(), port=port, print=None)
 
 if __name__ == "__main__":
-    run_server()
\ No newline at end of file
+    run_server()
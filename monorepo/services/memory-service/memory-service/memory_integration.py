@@ -5,18 +5,26 @@ Combines Cognee's graph memory with Memento MCP's knowledge graph
 """
 
 import asyncio
-import json
+import hashlib
 import os
-from typing import List, Dict, Any, Optional
-from datetime import datetime
+from typing import List, Dict, Any, Optional, AsyncIterator, Tuple
+
+import orjson
 
 # Cognee imports
 import cognee
-from cognee import add, search, prune
+from cognee import add, search
 
 # Neo4j connection
 from neo4j import AsyncGraphDatabase
 
+# Each entity with its outgoing relations, so one entity's edges are held at a time
+GRAPH_QUERY = """
+MATCH (e:Entity)
+OPTIONAL MATCH (e)-[r:RELATES_TO]->(to:Entity)
+RETURN e, collect({to: to.name, r: r}) AS relations
+"""
+
 class MemoryIntegrationService:
     """Integrates Cognee and Memento MCP for unified memory operations"""
     
@@ -25,14 +33,21 @@ class MemoryIntegrationService:
         self.neo4j_user = os.getenv("NEO4J_USERNAME", "neo4j")
         self.neo4j_password = os.getenv("NEO4J_PASSWORD", "development")
         self.driver = None
+        # Last result of neo4j_available(), kept current by the API's background check
+        self.neo4j_connected = False
+        self.ingest_inflight: Dict[bytes, asyncio.Future] = {}
         
+    def connect(self):
+        """Create the Neo4j driver; connections are only opened on first use"""
+        if self.driver is None:
+            self.driver = AsyncGraphDatabase.driver(
+                self.neo4j_uri,
+                auth=(self.neo4j_user, self.neo4j_password)
+            )
+    
     async def initialize(self):
-        """Initialize the memory service"""
-        # Initialize Neo4j driver
-        self.driver = AsyncGraphDatabase.driver(
-            self.neo4j_uri,
-            auth=(self.neo4j_user, self.neo4j_password)
-        )
+        """Initialize the memory service (wipes Cognee's stored data)"""
+        self.connect()
         
         # Initialize Cognee
         await cognee.prune.prune_system()
@@ -43,6 +58,45 @@ class MemoryIntegrationService:
         if self.driver:
             await self.driver.close()
     
+    async def neo4j_available(self) -> bool:
+        """Whether Neo4j can currently be reached"""
+        if self.driver is None:
+            return False
+        try:
+            await asyncio.wait_for(self.driver.verify_connectivity(), timeout=2.0)
+            return True
+        except Exception:
+            return False
+    
+    async def _ingest(self, content: str) -> List[Dict]:
+        """Add content to Cognee and extract its entities and relations"""
+        await add(content)
+        return await search(content)
+    
+    async def ingest(self, content: str) -> List[Dict]:
+        """
+        Run Cognee ingestion, sharing runs for identical in-flight content
+        
+        Concurrent submissions of the same content share a single Cognee
+        add + search run, keyed by a digest of the content. Nothing is kept
+        once the run finishes, so later submissions always reach Cognee.
+        
+        Args:
+            content: Text content to ingest
+            
+        Returns:
+            Cognee entity and relation results for the content
+        """
+        key = hashlib.blake2b(content.encode()).digest()
+        task = self.ingest_inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._ingest(content))
+            self.ingest_inflight[key] = task
+            task.add_done_callback(lambda _: self.ingest_inflight.pop(key, None))
+        
+        # Shielded so one cancelled caller doesn't cancel the shared run
+        return await asyncio.shield(task)
+    
     async def add_memory(self, content: str, metadata: Optional[Dict] = None) -> Dict[str, Any]:
         """
         Add content to both Cognee and create corresponding entities in Neo4j
@@ -55,80 +109,55 @@ class MemoryIntegrationService:
             Dict with status and created entities
         """
         try:
-            # Add to Cognee for semantic processing
-            await add(content)
-            
-            # Extract entities and relations using Cognee
-            cognee_results = await search(content)
+            # Add to Cognee and extract entities and relations
+            cognee_results = await self.ingest(content)
             
             # Create entities in Neo4j for Memento MCP
             entities_created = []
             relations_created = []
+            entity_rows = []
+            relation_rows = []
+            content_lower = content.lower()
+            
+            for item in cognee_results:
+                if item.get("type") == "entity":
+                    entity_name = item.get("name", "").replace(" ", "_")
+                    entity_type = item.get("entity_type", "general")
+                    observations = [content] if entity_name.lower() in content_lower else []
+                    
+                    entity_rows.append({
+                        "name": entity_name,
+                        "entityType": entity_type,
+                        "observations": observations
+                    })
+                    entities_created.append({
+                        "name": entity_name,
+                        "type": entity_type
+                    })
+                elif item.get("type") == "relation":
+                    from_entity = item.get("from", "").replace(" ", "_")
+                    to_entity = item.get("to", "").replace(" ", "_")
+                    relation_type = item.get("relation_type", "related_to")
+                    
+                    relation_rows.append({
+                        "from": from_entity,
+                        "to": to_entity,
+                        "relationType": relation_type,
+                        "strength": 0.8,
+                        "confidence": 0.9
+                    })
+                    relations_created.append({
+                        "from": from_entity,
+                        "to": to_entity,
+                        "type": relation_type
+                    })
             
-            async with self.driver.session() as session:
-                # Create entities from Cognee results
-                for item in cognee_results:
-                    if item.get("type") == "entity":
-                        entity_name = item.get("name", "").replace(" ", "_")
-                        entity_type = item.get("entity_type", "general")
-                        observations = [content] if entity_name.lower() in content.lower() else []
-                        
-                        # Create entity node
-                        query = """
-                        MERGE (e:Entity {name: $name})
-                        SET e.entityType = $entityType,
-                            e.observations = $observations,
-                            e.createdAt = timestamp(),
-                            e.updatedAt = timestamp()
-                        RETURN e
-                        """
-                        
-                        result = await session.run(
-                            query,
-                            name=entity_name,
-                            entityType=entity_type,
-                            observations=observations
-                        )
-                        
-                        entities_created.append({
-                            "name": entity_name,
-                            "type": entity_type
-                        })
-                
-                # Create relations from Cognee results
-                for item in cognee_results:
-                    if item.get("type") == "relation":
-                        from_entity = item.get("from", "").replace(" ", "_")
-                        to_entity = item.get("to", "").replace(" ", "_")
-                        relation_type = item.get("relation_type", "related_to")
-                        
-                        # Create relation
-                        query = """
-                        MATCH (from:Entity {name: $from})
-                        MATCH (to:Entity {name: $to})
-                        CREATE (from)-[r:RELATES_TO {
-                            relationType: $relationType,
-                            strength: $strength,
-                            confidence: $confidence,
-                            createdAt: timestamp()
-                        }]->(to)
-                        RETURN r
-                        """
-                        
-                        result = await session.run(
-                            query,
-                            from=from_entity,
-                            to=to_entity,
-                            relationType=relation_type,
-                            strength=0.8,
-                            confidence=0.9
-                        )
-                        
-                        relations_created.append({
-                            "from": from_entity,
-                            "to": to_entity,
-                            "type": relation_type
-                        })
+            # Write all entities, then all relations, in one transaction
+            if entity_rows or relation_rows:
+                async with self.driver.session() as session:
+                    await session.execute_write(
+                        self._write_graph, entity_rows, relation_rows
+                    )
             
             return {
                 "status": "success",
@@ -143,6 +172,64 @@ class MemoryIntegrationService:
                 "error": str(e)
             }
     
+    @staticmethod
+    async def _write_graph(tx, entity_rows: List[Dict], relation_rows: List[Dict]):
+        """Merge entities, then create relations between them"""
+        if entity_rows:
+            await tx.run(
+                """
+                UNWIND $rows AS row
+                MERGE (e:Entity {name: row.name})
+                SET e.entityType = row.entityType,
+                    e.observations = row.observations,
+                    e.createdAt = coalesce(e.createdAt, timestamp()),
+                    e.updatedAt = timestamp()
+                """,
+                rows=entity_rows
+            )
+        
+        if relation_rows:
+            await tx.run(
+                """
+                UNWIND $rows AS row
+                MATCH (from:Entity {name: row.from})
+                MATCH (to:Entity {name: row.to})
+                CREATE (from)-[r:RELATES_TO {
+                    relationType: row.relationType,
+                    strength: row.strength,
+                    confidence: row.confidence,
+                    createdAt: timestamp()
+                }]->(to)
+                """,
+                rows=relation_rows
+            )
+    
+    async def _neo4j_text_search(self, query: str, limit: int) -> List[Dict]:
+        """Find entities whose name or observations contain the query"""
+        # Session per call over the driver's connection pool, so concurrent
+        # requests run in parallel
+        async with self.driver.session() as session:
+            result = await session.run(
+                """
+                MATCH (e:Entity)
+                WHERE e.name CONTAINS $query 
+                   OR ANY(obs IN e.observations WHERE obs CONTAINS $query)
+                RETURN e
+                LIMIT $limit
+                """,
+                query=query,
+                limit=limit
+            )
+            
+            return [
+                {
+                    "name": record["e"]["name"],
+                    "type": record["e"].get("entityType", "unknown"),
+                    "observations": record["e"].get("observations", [])
+                }
+                async for record in result
+            ]
+    
     async def search_memory(self, query: str, limit: int = 10) -> Dict[str, Any]:
         """
         Search memories using both Cognee and Neo4j
@@ -155,34 +242,11 @@ class MemoryIntegrationService:
             Combined search results
         """
         try:
-            # Search using Cognee
-            cognee_results = await search(query)
-            
-            # Search using Neo4j vector similarity
-            neo4j_results = []
-            async with self.driver.session() as session:
-                # Text search in Neo4j
-                query_cypher = """
-                MATCH (e:Entity)
-                WHERE e.name CONTAINS $query 
-                   OR ANY(obs IN e.observations WHERE obs CONTAINS $query)
-                RETURN e
-                LIMIT $limit
-                """
-                
-                result = await session.run(
-                    query_cypher,
-                    query=query,
-                    limit=limit
-                )
-                
-                async for record in result:
-                    entity = record["e"]
-                    neo4j_results.append({
-                        "name": entity["name"],
-                        "type": entity.get("entityType", "unknown"),
-                        "observations": entity.get("observations", [])
-                    })
+            # Cognee and Neo4j are independent services; query both at once
+            cognee_results, neo4j_results = await asyncio.gather(
+                search(query),
+                self._neo4j_text_search(query, limit)
+            )
             
             return {
                 "status": "success",
@@ -197,6 +261,32 @@ class MemoryIntegrationService:
                 "error": str(e)
             }
     
+    async def _graph_rows(self) -> AsyncIterator[Tuple[Dict, List[Dict]]]:
+        """Yield each entity's node and its outgoing edges as Neo4j returns them"""
+        async with self.driver.session() as session:
+            result = await session.run(GRAPH_QUERY)
+            async for record in result:
+                entity = record["e"]
+                node = {
+                    "id": entity["name"],
+                    "label": entity["name"],
+                    "type": entity.get("entityType", "unknown"),
+                    "observations": entity.get("observations", [])
+                }
+                edges = [
+                    {
+                        "from": entity["name"],
+                        "to": relation["to"],
+                        "type": relation["r"].get("relationType", "related_to"),
+                        "strength": relation["r"].get("strength", 0.5),
+                        "confidence": relation["r"].get("confidence", 0.5)
+                    }
+                    for relation in record["relations"]
+                    # OPTIONAL MATCH yields a null relation for entities without any
+                    if relation["r"] is not None
+                ]
+                yield node, edges
+    
     async def get_knowledge_graph(self) -> Dict[str, Any]:
         """
         Get the full knowledge graph from Neo4j
@@ -208,38 +298,9 @@ class MemoryIntegrationService:
             nodes = []
             edges = []
             
-            async with self.driver.session() as session:
-                # Get all entities
-                node_query = """
-                MATCH (e:Entity)
-                RETURN e
-                """
-                
-                result = await session.run(node_query)
-                async for record in result:
-                    entity = record["e"]
-                    nodes.append({
-                        "id": entity["name"],
-                        "label": entity["name"],
-                        "type": entity.get("entityType", "unknown"),
-                        "observations": entity.get("observations", [])
-                    })
-                
-                # Get all relations
-                edge_query = """
-                MATCH (from:Entity)-[r:RELATES_TO]->(to:Entity)
-                RETURN from.name as from, to.name as to, r
-                """
-                
-                result = await session.run(edge_query)
-                async for record in result:
-                    edges.append({
-                        "from": record["from"],
-                        "to": record["to"],
-                        "type": record["r"].get("relationType", "related_to"),
-                        "strength": record["r"].get("strength", 0.5),
-                        "confidence": record["r"].get("confidence", 0.5)
-                    })
+            async for node, node_edges in self._graph_rows():
+                nodes.append(node)
+                edges.extend(node_edges)
             
             return {
                 "status": "success",
@@ -254,7 +315,29 @@ class MemoryIntegrationService:
                 "status": "error",
                 "error": str(e)
             }
-
+    
+    async def stream_knowledge_graph(self) -> AsyncIterator[bytes]:
+        """
+        Stream the knowledge graph from Neo4j as JSON lines
+        
+        Each entity is fetched together with its outgoing relations, so only
+        one entity's relations are held in memory at a time.
+        
+        Yields:
+            A {"node": ...} line per entity, followed by an {"edge": ...} line
+            per relation starting at that entity
+        """
+        try:
+            async for node, edges in self._graph_rows():
+                yield orjson.dumps({"node": node}, option=orjson.OPT_APPEND_NEWLINE)
+                for edge in edges:
+                    yield orjson.dumps({"edge": edge}, option=orjson.OPT_APPEND_NEWLINE)
+                    
+        except Exception as e:
+            yield orjson.dumps({
+                "status": "error",
+                "error": str(e)
+            }, option=orjson.OPT_APPEND_NEWLINE)
 
 # Example usage and API endpoints
 async def main():
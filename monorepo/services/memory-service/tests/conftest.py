@@ -5,32 +5,51 @@ Following T-1 to T-5 coding guide principles.
 
 import pytest
 import asyncio
-import tempfile
-import shutil
-from pathlib import Path
+import copy
+import re
 from unittest.mock import Mock, AsyncMock, patch
-import sys
 
-# Add memory-service to Python path  
-sys.path.insert(0, str(Path(__file__).parent.parent))
+try:
+    import uvloop
+    _loop_factory = uvloop.new_event_loop
+except ImportError:
+    _loop_factory = asyncio.new_event_loop
+
+# Static sample data, built once at import
+SAMPLE_MEMORY_DATA = {
+    "id": "test_memory_123",
+    "content": "This is a test memory",
+    "metadata": {
+        "timestamp": "2025-01-31T12:00:00Z",
+        "source": "test",
+        "tags": ["test", "memory"]
+    },
+    "embeddings": [0.1, 0.2, 0.3, 0.4, 0.5]
+}
+
+SAMPLE_QUERY = {
+    "text": "find memories about testing",
+    "filters": {"tags": ["test"]},
+    "limit": 10,
+    "threshold": 0.7
+}
 
 @pytest.fixture(scope="session")
 def event_loop():
-    """Create an instance of the default event loop for the test session."""
-    loop = asyncio.get_event_loop_policy().new_event_loop()
+    """Create a uvloop event loop (stock asyncio if unavailable) for the test session."""
+    loop = _loop_factory()
+    asyncio.set_event_loop(loop)
     yield loop
     loop.close()
 
 @pytest.fixture(scope="function")
-def temp_directory():
-    """Create temporary directory for test isolation."""
-    temp_dir = tempfile.mkdtemp()
-    yield Path(temp_dir)
-    shutil.rmtree(temp_dir, ignore_errors=True)
-
-@pytest.fixture(scope="function") 
-def mock_memory_store():
-    """Mock memory store for unit tests."""
+def temp_directory(tmp_path):
+    """Temporary directory for test isolation (alias for pytest's tmp_path)."""
+    return tmp_path
+
+@pytest.fixture(scope="session")
+def _mock_memory_store_template():
+    """Build the memory store mock once; tests get deep copies."""
     store = Mock()
     store.save = AsyncMock(return_value={"id": "test_id", "status": "saved"})
     store.retrieve = AsyncMock(return_value={"data": "test_data"})
@@ -39,8 +58,13 @@ def mock_memory_store():
     return store
 
 @pytest.fixture(scope="function")
-def mock_cognee_client():
-    """Mock Cognee client for integration tests."""
+def mock_memory_store(_mock_memory_store_template):
+    """Mock memory store for unit tests."""
+    return copy.deepcopy(_mock_memory_store_template)
+
+@pytest.fixture(scope="session")
+def _mock_cognee_client_template():
+    """Build the Cognee client mock once; tests get deep copies."""
     client = Mock()
     client.add = AsyncMock(return_value={"status": "processed"})
     client.search = AsyncMock(return_value={"results": []})
@@ -48,8 +72,13 @@ def mock_cognee_client():
     return client
 
 @pytest.fixture(scope="function")
-def mock_memento_client():
-    """Mock Memento MCP client for integration tests."""
+def mock_cognee_client(_mock_cognee_client_template):
+    """Mock Cognee client for integration tests."""
+    return copy.deepcopy(_mock_cognee_client_template)
+
+@pytest.fixture(scope="session")
+def _mock_memento_client_template():
+    """Build the Memento MCP client mock once; tests get deep copies."""
     client = Mock()
     client.store_memory = AsyncMock(return_value={"id": "mem_123"})
     client.retrieve_memory = AsyncMock(return_value={"content": "memory"})
@@ -57,48 +86,51 @@ def mock_memento_client():
     return client
 
 @pytest.fixture(scope="function")
+def mock_memento_client(_mock_memento_client_template):
+    """Mock Memento MCP client for integration tests."""
+    return copy.deepcopy(_mock_memento_client_template)
+
+@pytest.fixture(scope="session")
 def sample_memory_data():
-    """Sample memory data for testing."""
-    return {
-        "id": "test_memory_123",
-        "content": "This is a test memory",
-        "metadata": {
-            "timestamp": "2025-01-31T12:00:00Z",
-            "source": "test",
-            "tags": ["test", "memory"]
-        },
-        "embeddings": [0.1, 0.2, 0.3, 0.4, 0.5]
-    }
+    """Sample memory data for testing (shared; copy before mutating)."""
+    return SAMPLE_MEMORY_DATA
 
-@pytest.fixture(scope="function")
+@pytest.fixture(scope="session")
 def sample_query():
-    """Sample query data for testing."""
-    return {
-        "text": "find memories about testing",
-        "filters": {"tags": ["test"]},
-        "limit": 10,
-        "threshold": 0.7
-    }
+    """Sample query data for testing (shared; copy before mutating)."""
+    return SAMPLE_QUERY
+
+@pytest.fixture(scope="session")
+def _mock_database_template():
+    """Build the database connection mock once; tests get deep copies."""
+    mock_conn = Mock()
+    mock_conn.execute = AsyncMock(return_value=[])
+    mock_conn.fetch = AsyncMock(return_value=[])
+    mock_conn.close = AsyncMock()
+    return mock_conn
 
 @pytest.fixture(scope="function")
-def mock_database():
+def mock_database(_mock_database_template):
     """Mock database connection for integration tests."""
     with patch('memory_service.database.connect') as mock_connect:
-        mock_conn = Mock()
-        mock_conn.execute = AsyncMock(return_value=[])
-        mock_conn.fetch = AsyncMock(return_value=[])
-        mock_conn.close = AsyncMock()
+        mock_conn = copy.deepcopy(_mock_database_template)
         mock_connect.return_value = mock_conn
         yield mock_conn
 
+@pytest.fixture(scope="session")
+def _mock_vector_db_template():
+    """Build the vector store mock once; tests get deep copies."""
+    instance = Mock()
+    instance.add_vectors = AsyncMock(return_value=True)
+    instance.search_vectors = AsyncMock(return_value=[])
+    instance.delete_vectors = AsyncMock(return_value=True)
+    return instance
+
 @pytest.fixture(scope="function")
-def mock_vector_db():
+def mock_vector_db(_mock_vector_db_template):
     """Mock vector database for integration tests."""
     with patch('memory_service.vector_store.VectorStore') as mock_vs:
-        instance = Mock()
-        instance.add_vectors = AsyncMock(return_value=True)
-        instance.search_vectors = AsyncMock(return_value=[])
-        instance.delete_vectors = AsyncMock(return_value=True)
+        instance = copy.deepcopy(_mock_vector_db_template)
         mock_vs.return_value = instance
         yield instance
 
@@ -118,20 +150,41 @@ def pytest_configure(config):
         "markers", "memory_store: Tests involving memory storage operations"
     )
 
+_UNIT_RE = re.compile(r"unit|spec\.py")
+_MEMORY_STORE_RE = re.compile(r"memory|cognee|memento")
+
+def _append_mark(item, mark):
+    """Attach a prebuilt Mark directly, skipping add_marker's decorator handling."""
+    item.own_markers.append(mark)
+    item.keywords[mark.name] = mark
+
 def pytest_collection_modifyitems(config, items):
     """Auto-mark tests based on patterns."""
+    asyncio_mark = pytest.mark.asyncio.mark
+    async_test_mark = pytest.mark.async_test.mark
+    integration_mark = pytest.mark.integration.mark
+    unit_mark = pytest.mark.unit.mark
+    memory_store_mark = pytest.mark.memory_store.mark
+    
     for item in items:
-        # Mark async tests
-        if asyncio.iscoroutinefunction(item.function):
-            item.add_marker(pytest.mark.asyncio)
-            item.add_marker(pytest.mark.async_test)
+        nodeid = item.nodeid
+        existing = {mark.name for mark in item.iter_markers()}
+        
+        # Mark async tests (doctest and other non-Function items have no coroutine)
+        if isinstance(item, pytest.Function) and asyncio.iscoroutinefunction(item.function):
+            if "asyncio" not in existing:
+                _append_mark(item, asyncio_mark)
+            if "async_test" not in existing:
+                _append_mark(item, async_test_mark)
         
         # Mark integration tests  
-        if "integration" in item.nodeid:
-            item.add_marker(pytest.mark.integration)
-        elif "unit" in item.nodeid or "spec.py" in item.nodeid:
-            item.add_marker(pytest.mark.unit)
+        if "integration" in nodeid:
+            if "integration" not in existing:
+                _append_mark(item, integration_mark)
+        elif _UNIT_RE.search(nodeid):
+            if "unit" not in existing:
+                _append_mark(item, unit_mark)
         
         # Mark memory store tests
-        if any(keyword in item.nodeid.lower() for keyword in ["memory", "cognee", "memento"]):
-            item.add_marker(pytest.mark.memory_store)
\ No newline at end of file
+        if "memory_store" not in existing and _MEMORY_STORE_RE.search(nodeid.lower()):
+            _append_mark(item, memory_store_mark)
@@ -8,26 +8,23 @@ import sys
 from pathlib import Path
 from unittest.mock import patch, Mock
 
-# Import module under test
-from . import __init__ as superclaude_init
+
+@pytest.fixture(scope="session")
+def sc_module():
+    """Import the module under test once for the whole session."""
+    import SuperClaude
+    return SuperClaude
 
 
 class TestSuperClaudeInit:
     """Test cases for SuperClaude initialization module."""
     
-    def test_module_has_version(self):
+    def test_module_has_version(self, sc_module):
         """T-5 (SHOULD): Unit-test that module exports version."""
         # Verify module has version attribute or can access version
-        assert hasattr(superclaude_init, '__version__') or \
-               hasattr(superclaude_init, 'VERSION') or \
-               Path(__file__).parent.parent / "VERSION" exists()
-    
-    def test_module_imports_successfully(self):
-        """T-1 (MUST): Test that module imports without errors."""
-        # The fact that we imported it above means this passes
-        # But let's be explicit
-        import SuperClaude
-        assert SuperClaude is not None
+        assert hasattr(sc_module, '__version__') or \
+               hasattr(sc_module, 'VERSION') or \
+               (Path(__file__).parent.parent / "VERSION").exists()
     
     @pytest.mark.unit
     def test_module_structure_integrity(self):
@@ -40,15 +37,10 @@ class TestSuperClaudeInit:
             assert (module_path / file_name).exists(), f"Missing required file: {file_name}"
     
     @pytest.mark.unit
-    def test_module_metadata(self):
-        """Test module metadata is properly defined."""
-        # Check if standard module attributes exist
-        import SuperClaude
-        
-        # These should be defined somewhere in the module
-        metadata_attrs = ['__name__', '__package__']
-        for attr in metadata_attrs:
-            assert hasattr(SuperClaude, attr) or attr in dir(SuperClaude)
+    @pytest.mark.parametrize("attr", ['__name__', '__package__', '__doc__'])
+    def test_module_metadata(self, sc_module, attr):
+        """T-1 (MUST): Module imports cleanly and defines standard metadata."""
+        assert hasattr(sc_module, attr) or attr in dir(sc_module)
 
 
 # Example of testing a specific function if __init__.py has any
@@ -65,20 +57,9 @@ class TestInitializationFunctions:
         # def test_setup_function(self):
         #     with patch('SuperClaude.config.load_config') as mock_load:
         #         mock_load.return_value = {'test': 'config'}
-        #         result = superclaude_init.setup()
+        #         result = sc_module.setup()
         #         assert result is not None
         #         mock_load.assert_called_once()
         
         # For now, just pass to maintain test structure
         pass
-    
-    @pytest.mark.unit
-    def test_module_level_constants(self):
-        """Test any module-level constants or configurations."""
-        # Example test structure for constants
-        # if hasattr(superclaude_init, 'DEFAULT_CONFIG'):
-        #     assert isinstance(superclaude_init.DEFAULT_CONFIG, dict)
-        
-        # For now, just verify module can be inspected
-        import SuperClaude
-        assert dir(SuperClaude) is not None
\ No newline at end of file
@@ -4,15 +4,33 @@ Following T-1 (MUST) principle: Colocate unit tests, separate from integration t
 """
 
 import pytest
-import sys
 import os
-from pathlib import Path
-from unittest.mock import Mock, patch
-import tempfile
-import shutil
+from contextlib import ExitStack
+from unittest.mock import MagicMock, Mock, patch
 
-# Add SuperClaude to Python path
-sys.path.insert(0, str(Path(__file__).parent.parent / "SuperClaude"))
+# Static sample data, built once at import
+SAMPLE_CONFIG = {
+    "features": {
+        "cli_integration": True,
+        "web_ui": True,
+        "api_server": False
+    },
+    "profiles": {
+        "default": "developer",
+        "available": ["minimal", "developer", "quick"]
+    },
+    "version": "1.0.0"
+}
+
+SAMPLE_PROFILE = {
+    "name": "test_profile",
+    "description": "Test profile for unit tests",
+    "components": ["core", "cli"],
+    "settings": {
+        "debug": True,
+        "verbose": False
+    }
+}
 
 @pytest.fixture(scope="session")
 def test_config():
@@ -24,80 +42,72 @@ def test_config():
     }
 
 @pytest.fixture(scope="function")
-def temp_directory():
-    """Create a temporary directory for test isolation."""
-    temp_dir = tempfile.mkdtemp()
-    yield temp_dir
-    shutil.rmtree(temp_dir, ignore_errors=True)
+def temp_directory(tmp_path):
+    """Temporary directory for test isolation (alias for pytest's tmp_path)."""
+    return tmp_path
+
+def _patched(targets, mocks):
+    """Patch each target with its mock for the duration of one test."""
+    stack = ExitStack()
+    for name, target in targets.items():
+        stack.enter_context(patch(target, new=mocks[name]))
+    return stack
+
+_FS_TARGETS = {
+    'exists': 'os.path.exists',
+    'makedirs': 'os.makedirs',
+    'open': 'builtins.open'
+}
 
+_SUBPROCESS_TARGETS = {
+    'run': 'subprocess.run',
+    'popen': 'subprocess.Popen'
+}
+
+_NETWORK_TARGETS = {
+    'get': 'requests.get',
+    'post': 'requests.post'
+}
+
+# Mocks are built per test: anything a test sets on them (side_effect, child
+# attributes) must not leak into the next one
 @pytest.fixture(scope="function")
 def mock_file_system():
     """Mock file system operations for unit tests."""
-    with patch('os.path.exists') as mock_exists, \
-         patch('os.makedirs') as mock_makedirs, \
-         patch('builtins.open') as mock_open:
-        mock_exists.return_value = True
-        yield {
-            'exists': mock_exists,
-            'makedirs': mock_makedirs,
-            'open': mock_open
-        }
+    mocks = {name: MagicMock() for name in _FS_TARGETS}
+    mocks['exists'].return_value = True
+    with _patched(_FS_TARGETS, mocks):
+        yield mocks
 
 @pytest.fixture(scope="function")
 def mock_subprocess():
     """Mock subprocess operations for unit tests."""
-    with patch('subprocess.run') as mock_run, \
-         patch('subprocess.Popen') as mock_popen:
-        mock_run.return_value = Mock(returncode=0, stdout="", stderr="")
-        yield {
-            'run': mock_run,
-            'popen': mock_popen
-        }
+    mocks = {name: MagicMock() for name in _SUBPROCESS_TARGETS}
+    mocks['run'].return_value = Mock(returncode=0, stdout="", stderr="")
+    with _patched(_SUBPROCESS_TARGETS, mocks):
+        yield mocks
 
 @pytest.fixture(scope="function")
 def mock_network():
     """Mock network operations for unit tests."""
-    with patch('requests.get') as mock_get, \
-         patch('requests.post') as mock_post:
-        mock_response = Mock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = {"status": "success"}
-        mock_get.return_value = mock_response
-        mock_post.return_value = mock_response
-        yield {
-            'get': mock_get,
-            'post': mock_post,
-            'response': mock_response
-        }
+    mocks = {name: MagicMock() for name in ('get', 'post', 'response')}
+    mock_response = mocks['response']
+    mock_response.status_code = 200
+    mock_response.json.return_value = {"status": "success"}
+    mocks['get'].return_value = mock_response
+    mocks['post'].return_value = mock_response
+    with _patched(_NETWORK_TARGETS, mocks):
+        yield mocks
 
-@pytest.fixture(scope="function")
+@pytest.fixture(scope="session")
 def sample_config():
-    """Sample configuration data for testing."""
-    return {
-        "features": {
-            "cli_integration": True,
-            "web_ui": True,
-            "api_server": False
-        },
-        "profiles": {
-            "default": "developer",
-            "available": ["minimal", "developer", "quick"]
-        },
-        "version": "1.0.0"
-    }
+    """Sample configuration data for testing (shared; copy before mutating)."""
+    return SAMPLE_CONFIG
 
-@pytest.fixture(scope="function")
+@pytest.fixture(scope="session")
 def sample_profile():
-    """Sample profile data for testing."""
-    return {
-        "name": "test_profile",
-        "description": "Test profile for unit tests",
-        "components": ["core", "cli"],
-        "settings": {
-            "debug": True,
-            "verbose": False
-        }
-    }
+    """Sample profile data for testing (shared; copy before mutating)."""
+    return SAMPLE_PROFILE
 
 # Test markers
 def pytest_configure(config):
@@ -115,16 +125,27 @@ def pytest_configure(config):
         "markers", "slow: mark test as slow running"
     )
 
+def _append_mark(item, mark):
+    """Attach a prebuilt Mark directly, skipping add_marker's decorator handling."""
+    item.own_markers.append(mark)
+    item.keywords[mark.name] = mark
+
 def pytest_collection_modifyitems(config, items):
     """Automatically mark tests based on location."""
+    integration_mark = pytest.mark.integration.mark
+    unit_mark = pytest.mark.unit.mark
+    slow_mark = pytest.mark.slow.mark
+    
     for item in items:
-        # Mark integration tests
+        existing = {mark.name for mark in item.own_markers}
+        
+        # Mark integration tests; everything else defaults to unit
         if "integration" in item.nodeid:
-            item.add_marker(pytest.mark.integration)
-        # Mark unit tests (default for tests not in integration folders)
-        elif "unit" in item.nodeid or "integration" not in item.nodeid:
-            item.add_marker(pytest.mark.unit)
+            if "integration" not in existing:
+                _append_mark(item, integration_mark)
+        elif "unit" not in existing:
+            _append_mark(item, unit_mark)
         
         # Mark slow tests
-        if "slow" in item.name.lower():
-            item.add_marker(pytest.mark.slow)
\ No newline at end of file
+        if "slow" not in existing and "slow" in item.name.lower():
+            _append_mark(item, slow_mark)
@@ -11,25 +11,58 @@ from pathlib import Path
 
 import click
 import httpx
-from rich import print
-from rich.console import Console
-from rich.table import Table
-from rich.panel import Panel
-from rich.syntax import Syntax
+import orjson
 
-console = Console()
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+
+try:
+    import h2  # noqa: F401 - enables httpx HTTP/2 support
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+_console = None
+
+
+def get_console():
+    """Create the rich console on first use so commands that never print skip the import"""
+    global _console
+    if _console is None:
+        from rich.console import Console
+        # When piped, skip color probing and ANSI output entirely
+        is_tty = sys.stdout.isatty()
+        _console = Console(
+            force_terminal=is_tty,
+            color_system="auto" if is_tty else None,
+            highlight=False
+        )
+    return _console
 
 # Default service URL
 DEFAULT_URL = "http://localhost:8505"
 
+# Task polling backoff (seconds)
+POLL_INITIAL_DELAY = 0.2
+POLL_MAX_DELAY = 2.0
+
 
 @click.group()
 @click.option("--url", default=DEFAULT_URL, help="Unified Query Service URL")
 @click.pass_context
 def cli(ctx, url):
     """Unified Query Service CLI"""
+    if uvloop is not None:
+        uvloop.install()
     ctx.ensure_object(dict)
     ctx.obj["url"] = url
+    ctx.obj["client_factory"] = lambda: httpx.AsyncClient(
+        base_url=url,
+        http2=HTTP2_AVAILABLE,
+        limits=httpx.Limits(max_keepalive_connections=8)
+    )
 
 
 @cli.command()
@@ -44,10 +77,11 @@ def cli(ctx, url):
 @click.pass_context
 def query(ctx, query, mode, sources, max_results, format):
     """Execute a query across memory systems"""
-    url = ctx.obj["url"]
+    console = get_console()
+    client_factory = ctx.obj["client_factory"]
     
     async def run_query():
-        async with httpx.AsyncClient() as client:
+        async with client_factory() as client:
             payload = {
                 "query": query,
                 "mode": mode,
@@ -59,46 +93,52 @@ def query(ctx, query, mode, sources, max_results, format):
             if sources:
                 payload["sources"] = list(sources)
             
-            response = await client.post(f"{url}/api/query", json=payload)
+            response = await client.post("/api/query", json=payload)
             response.raise_for_status()
             
-            return response.json()
+            return orjson.loads(response.content)
     
     with console.status(f"Querying: {query}..."):
         result = asyncio.run(run_query())
     
     # Display results
     if format == "json":
-        print(json.dumps(result, indent=2))
+        from rich import print
+        print(orjson.dumps(result, option=orjson.OPT_INDENT_2).decode())
     
     elif format == "table":
+        from rich.table import Table
         table = Table(title=f"Query Results for: {query}")
         table.add_column("Source", style="cyan")
         table.add_column("Score", style="green")
         table.add_column("Content", style="white", overflow="fold")
         
-        for res in result["results"]:
-            table.add_row(
+        rows = [
+            (
                 res["source"],
                 f"{res['score']:.3f}",
-                res["content"][:100] + "..." if len(res["content"]) > 100 else res["content"]
+                res["content"] if len(res["content"]) <= 100 else res["content"][:100] + "..."
             )
+            for res in result["results"]
+        ]
+        for row in rows:
+            table.add_row(*row)
         
         console.print(table)
-        console.print(f"\nTotal results: {result['total_results']}")
-        console.print(f"Processing time: {result['processing_time']:.2f}s")
+        click.echo(f"\nTotal results: {result['total_results']}")
+        click.echo(f"Processing time: {result['processing_time']:.2f}s")
     
     else:  # markdown
-        console.print(f"# Query Results\n")
-        console.print(f"**Query**: {query}")
-        console.print(f"**Mode**: {mode}")
-        console.print(f"**Total Results**: {result['total_results']}\n")
+        click.echo(f"# Query Results\n")
+        click.echo(f"**Query**: {query}")
+        click.echo(f"**Mode**: {mode}")
+        click.echo(f"**Total Results**: {result['total_results']}\n")
         
         for i, res in enumerate(result["results"], 1):
-            console.print(f"## Result {i}")
-            console.print(f"- **Source**: {res['source']}")
-            console.print(f"- **Score**: {res['score']:.3f}")
-            console.print(f"- **Content**: {res['content']}\n")
+            click.echo(f"## Result {i}")
+            click.echo(f"- **Source**: {res['source']}")
+            click.echo(f"- **Score**: {res['score']:.3f}")
+            click.echo(f"- **Content**: {res['content']}\n")
 
 
 @cli.command()
@@ -112,10 +152,12 @@ def query(ctx, query, mode, sources, max_results, format):
 @click.pass_context
 def process(ctx, file_path, pipeline, format, store_in):
     """Process a document"""
-    url = ctx.obj["url"]
+    from rich.panel import Panel
+    console = get_console()
+    client_factory = ctx.obj["client_factory"]
     
-    async def process_document():
-        async with httpx.AsyncClient() as client:
+    async def _main():
+        async with client_factory() as client:
             payload = {
                 "file_path": str(Path(file_path).absolute()),
                 "pipeline": pipeline,
@@ -125,21 +167,20 @@ def process(ctx, file_path, pipeline, format, store_in):
             if store_in:
                 payload["store_in"] = list(store_in)
             
-            response = await client.post(f"{url}/api/document/process", json=payload)
-            response.raise_for_status()
+            with console.status(f"Processing document: {file_path}..."):
+                response = await client.post("/api/document/process", json=payload)
+                response.raise_for_status()
+                result = orjson.loads(response.content)
             
-            return response.json()
-    
-    with console.status(f"Processing document: {file_path}..."):
-        result = asyncio.run(process_document())
-    
-    console.print(Panel(f"Task ID: {result['task_id']}", title="Document Processing Started"))
-    console.print(f"Status: {result['status']}")
-    console.print(f"Message: {result['message']}")
+            console.print(Panel(f"Task ID: {result['task_id']}", title="Document Processing Started"))
+            click.echo(f"Status: {result['status']}")
+            click.echo(f"Message: {result['message']}")
+            
+            # Option to track progress on the same loop and client
+            if click.confirm("Track processing progress?"):
+                await _track(client, result['task_id'])
     
-    # Option to track progress
-    if click.confirm("Track processing progress?"):
-        track_task(ctx, result['task_id'])
+    asyncio.run(_main())
 
 
 @cli.command()
@@ -147,23 +188,29 @@ def process(ctx, file_path, pipeline, format, store_in):
 @click.pass_context
 def track_task(ctx, task_id):
     """Track document processing task"""
-    url = ctx.obj["url"]
+    client_factory = ctx.obj["client_factory"]
     
-    async def get_status():
-        async with httpx.AsyncClient() as client:
-            response = await client.get(f"{url}/api/document/status/{task_id}")
-            if response.status_code == 404:
-                return None
-            response.raise_for_status()
-            return response.json()
+    async def _main():
+        async with client_factory() as client:
+            await _track(client, task_id)
     
+    asyncio.run(_main())
+
+
+async def _track(client, task_id):
+    """Poll a processing task until it finishes, then display its final status"""
+    from rich.panel import Panel
+    console = get_console()
+    delay = POLL_INITIAL_DELAY
     with console.status(f"Tracking task: {task_id}...") as status:
         while True:
-            task_status = asyncio.run(get_status())
-            
-            if not task_status:
+            response = await client.get(f"/api/document/status/{task_id}")
+            if response.status_code == 404:
+                task_status = None
                 console.print("[red]Task not found[/red]")
                 break
+            response.raise_for_status()
+            task_status = orjson.loads(response.content)
             
             # Update status
             status.update(
@@ -174,7 +221,8 @@ def track_task(ctx, task_id):
             if task_status['status'] in ['completed', 'failed']:
                 break
             
-            asyncio.run(asyncio.sleep(2))
+            await asyncio.sleep(delay)
+            delay = min(delay * 1.5, POLL_MAX_DELAY)
     
     # Display final status
     if task_status:
@@ -188,7 +236,7 @@ def track_task(ctx, task_id):
         if task_status['status'] == 'failed' and task_status['errors']:
             console.print("[red]Errors:[/red]")
             for error in task_status['errors']:
-                console.print(f"  - {error}")
+                click.echo(f"  - {error}")
 
 
 @cli.command()
@@ -200,20 +248,22 @@ def track_task(ctx, task_id):
 @click.pass_context
 def deploy(ctx, workflow_id, config, triggers):
     """Deploy a workflow"""
-    url = ctx.obj["url"]
+    from rich.panel import Panel
+    console = get_console()
+    client_factory = ctx.obj["client_factory"]
     
     async def deploy_workflow():
-        async with httpx.AsyncClient() as client:
+        async with client_factory() as client:
             payload = {
                 "workflow_id": workflow_id,
                 "config": json.loads(config) if config else {},
                 "triggers": list(triggers)
             }
             
-            response = await client.post(f"{url}/api/workflow/deploy", json=payload)
+            response = await client.post("/api/workflow/deploy", json=payload)
             response.raise_for_status()
             
-            return response.json()
+            return orjson.loads(response.content)
     
     with console.status(f"Deploying workflow: {workflow_id}..."):
         result = asyncio.run(deploy_workflow())
@@ -231,13 +281,15 @@ def deploy(ctx, workflow_id, config, triggers):
 @click.pass_context
 def workflows(ctx):
     """List available workflows"""
-    url = ctx.obj["url"]
+    from rich.table import Table
+    console = get_console()
+    client_factory = ctx.obj["client_factory"]
     
     async def list_workflows():
-        async with httpx.AsyncClient() as client:
-            response = await client.get(f"{url}/api/workflow/list")
+        async with client_factory() as client:
+            response = await client.get("/api/workflow/list")
             response.raise_for_status()
-            return response.json()
+            return orjson.loads(response.content)
     
     result = asyncio.run(list_workflows())
     
@@ -262,14 +314,16 @@ def workflows(ctx):
 @click.pass_context
 def health(ctx):
     """Check service health"""
-    url = ctx.obj["url"]
+    from rich.table import Table
+    console = get_console()
+    client_factory = ctx.obj["client_factory"]
     
     async def check_health():
-        async with httpx.AsyncClient() as client:
+        async with client_factory() as client:
             try:
-                response = await client.get(f"{url}/health")
+                response = await client.get("/health")
                 response.raise_for_status()
-                return response.json()
+                return orjson.loads(response.content)
             except Exception as e:
                 return {"error": str(e)}
     
@@ -294,45 +348,47 @@ def health(ctx):
         )
     
     console.print(table)
-    console.print(f"\nOverall Status: {result.get('status', 'unknown')}")
+    click.echo(f"\nOverall Status: {result.get('status', 'unknown')}")
 
 
 @cli.command()
 @click.pass_context
 def stats(ctx):
     """Show service statistics"""
-    url = ctx.obj["url"]
+    from rich.panel import Panel
+    console = get_console()
+    client_factory = ctx.obj["client_factory"]
     
     async def get_stats():
-        async with httpx.AsyncClient() as client:
-            response = await client.get(f"{url}/api/stats")
+        async with client_factory() as client:
+            response = await client.get("/api/stats")
             response.raise_for_status()
-            return response.json()
+            return orjson.loads(response.content)
     
     result = asyncio.run(get_stats())
     
     # Query Statistics
     console.print(Panel("Query Statistics", style="bold blue"))
     query_stats = result.get("query_stats", {})
-    console.print(f"Total Queries: {query_stats.get('total_queries', 0)}")
-    console.print(f"Average Latency: {query_stats.get('average_latency', 0):.2f}s")
-    console.print(f"Cache Hit Rate: {query_stats.get('cache_hit_rate', 0):.2%}")
+    click.echo(f"Total Queries: {query_stats.get('total_queries', 0)}")
+    click.echo(f"Average Latency: {query_stats.get('average_latency', 0):.2f}s")
+    click.echo(f"Cache Hit Rate: {query_stats.get('cache_hit_rate', 0):.2%}")
     
     # Document Statistics
-    console.print("\n")
+    click.echo("\n")
     console.print(Panel("Document Processing Statistics", style="bold green"))
     doc_stats = result.get("document_stats", {})
-    console.print(f"Total Processed: {doc_stats.get('total_processed', 0)}")
-    console.print(f"Success Rate: {doc_stats.get('success_rate', 0):.2%}")
-    console.print(f"Average Time: {doc_stats.get('average_processing_time', 0):.2f}s")
+    click.echo(f"Total Processed: {doc_stats.get('total_processed', 0)}")
+    click.echo(f"Success Rate: {doc_stats.get('success_rate', 0):.2%}")
+    click.echo(f"Average Time: {doc_stats.get('average_processing_time', 0):.2f}s")
     
     # Workflow Statistics
-    console.print("\n")
+    click.echo("\n")
     console.print(Panel("Workflow Statistics", style="bold yellow"))
     workflow_stats = result.get("workflow_stats", {})
-    console.print(f"Total Deployments: {workflow_stats.get('total_deployments', 0)}")
-    console.print(f"Total Executions: {workflow_stats.get('total_executions', 0)}")
-    console.print(f"Success Rate: {workflow_stats.get('success_rate', 0):.2%}")
+    click.echo(f"Total Deployments: {workflow_stats.get('total_deployments', 0)}")
+    click.echo(f"Total Executions: {workflow_stats.get('total_executions', 0)}")
+    click.echo(f"Success Rate: {workflow_stats.get('success_rate', 0):.2%}")
 
 
 @cli.command()
@@ -340,16 +396,18 @@ def stats(ctx):
 @click.pass_context
 def analyze(ctx, query):
     """Analyze a query to see routing recommendations"""
-    url = ctx.obj["url"]
+    from rich.panel import Panel
+    console = get_console()
+    client_factory = ctx.obj["client_factory"]
     
     async def analyze_query():
-        async with httpx.AsyncClient() as client:
+        async with client_factory() as client:
             response = await client.post(
-                f"{url}/api/query/analyze",
+                "/api/query/analyze",
                 params={"query": query}
             )
             response.raise_for_status()
-            return response.json()
+            return orjson.loads(response.content)
     
     result = asyncio.run(analyze_query())
     
@@ -367,7 +425,7 @@ def analyze(ctx, query):
     if analysis.get('features_needed'):
         console.print(f"\n[bold]Features Needed:[/bold]")
         for feature in analysis['features_needed']:
-            console.print(f"  - {feature}")
+            click.echo(f"  - {feature}")
 
 
 if __name__ == "__main__":
@@ -3,77 +3,341 @@ Memory System Adapters - Interfaces to different memory systems
 """
 
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any, Optional
+from base64 import b64encode
+from collections import deque
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from hashlib import blake2b
 import httpx
+import numpy as np
+import orjson
 import asyncio
+import socket
+import time
 
 import structlog
 
+from .config import settings
+
 logger = structlog.get_logger()
 
+# Health probes: short timeout, and results reused briefly to absorb probe storms
+HEALTH_CHECK_TIMEOUT = httpx.Timeout(1.0)
+HEALTH_CHECK_TTL = 2.0
+
+# Connections opened per backend at startup
+WARMUP_CONNECTIONS = 4
+
+# Search hedging: re-issue a slow search once the primary exceeds the hedge delay
+DEFAULT_HEDGE_AFTER = 0.050
+LATENCY_WINDOW = 100
+MIN_LATENCY_SAMPLES = 20
+
+# Circuit breaker: open after this many consecutive failures, backing off up to the cap
+CIRCUIT_FAILURE_THRESHOLD = 5
+CIRCUIT_MAX_OPEN = 30.0
+
+JSON_HEADERS = {"content-type": "application/json"}
+
+# Searches prefer NDJSON (one result per line) so decoding overlaps the transfer
+NDJSON_CONTENT_TYPE = "application/x-ndjson"
+SEARCH_HEADERS = {**JSON_HEADERS, "accept": f"{NDJSON_CONTENT_TYPE}, application/json;q=0.9"}
+
+
+def _encode_json(body: Dict[str, Any]) -> bytes:
+    """Encode a request body with orjson (string-keyed like stdlib json, numpy-aware)"""
+    return orjson.dumps(
+        body,
+        option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NAIVE_UTC
+    )
+
+
+def _encode_vector(vector: List[float]) -> str:
+    """Pack an embedding as base64 little-endian float16 (~8x smaller than a JSON list)"""
+    return b64encode(np.asarray(vector, dtype="<f2").tobytes()).decode("ascii")
+
+
+# Small request/response exchanges: disable Nagle, and let the kernel probe idle pooled sockets
+SOCKET_OPTIONS = [
+    (socket.IPPROTO_TCP, socket.TCP_NODELAY, 1),
+    (socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1),
+]
+
+
+class CircuitOpenError(Exception):
+    """Raised when a backend's circuit breaker is open"""
+    pass
+
+
+# One pooled client shared by every adapter instance in the process
+_shared_client: Optional[httpx.AsyncClient] = None
+
+
+def get_shared_client() -> httpx.AsyncClient:
+    """Get the shared HTTP/2 client, creating it on first use"""
+    global _shared_client
+    if _shared_client is None or _shared_client.is_closed:
+        pool_size = settings.CONNECTION_POOL_SIZE * max(len(settings.ENABLED_MEMORY_SYSTEMS), 1)
+        # Over plain http:// HTTP/2 is only used with prior knowledge (h2c); otherwise
+        # it is negotiated via TLS ALPN and cleartext backends stay on HTTP/1.1
+        transport = httpx.AsyncHTTPTransport(
+            http1=not settings.HTTP2_PRIOR_KNOWLEDGE,
+            http2=True,
+            retries=0,
+            limits=httpx.Limits(
+                max_connections=pool_size,
+                max_keepalive_connections=pool_size,
+                keepalive_expiry=60
+            ),
+            socket_options=SOCKET_OPTIONS
+        )
+        _shared_client = httpx.AsyncClient(
+            transport=transport,
+            timeout=httpx.Timeout(30.0, connect=2.0)
+        )
+    return _shared_client
+
+
+async def close_shared_client():
+    """Close the shared HTTP client at service shutdown"""
+    global _shared_client
+    if _shared_client is not None:
+        await _shared_client.aclose()
+        _shared_client = None
+
 
 class MemorySystemAdapter(ABC):
     """Base adapter for memory systems"""
     
+    # Key into settings.MEMORY_SYSTEM_CONFIG
+    name: str = ""
+    search_path: str = ""
+    store_path: str = ""
+    # Backends that decode packed float16 embeddings set this; the rest get a float list
+    PACKED_VECTORS: bool = False
+    
     def __init__(self, base_url: str):
         self.base_url = base_url
-        self.client = httpx.AsyncClient(timeout=30.0)
+        self.client: Optional[httpx.AsyncClient] = None
+        # Endpoint URLs are parsed once rather than formatted per request
+        self._search_url = httpx.URL(f"{base_url}{self.search_path}")
+        self._store_url = httpx.URL(f"{base_url}{self.store_path}")
+        self._health_url = httpx.URL(f"{base_url}/health")
         self._initialized = False
+        self._health: Optional[bool] = None
+        self._health_checked_at = 0.0
+        self._config = settings.MEMORY_SYSTEM_CONFIG.get(self.name, {})
+        self._latencies: deque = deque(maxlen=LATENCY_WINDOW)
+        # Per-backend deadline from config instead of the client-wide 30s default
+        timeout = self._config.get("timeout", 30)
+        self._timeout = httpx.Timeout(timeout, connect=min(timeout, 1.0))
+        self._consec_failures = 0
+        self._open_until = 0.0
+        # Searches in flight, keyed by request body, shared by identical concurrent callers
+        self._inflight: Dict[tuple, asyncio.Task] = {}
     
     async def initialize(self):
         """Initialize the adapter"""
+        self.client = get_shared_client()
         self._initialized = True
+        await self._warm_up()
         logger.info(f"Initialized {self.__class__.__name__}", url=self.base_url)
     
+    async def _warm_up(self):
+        """Open keep-alive connections ahead of traffic so the first queries skip the handshake"""
+        responses = await asyncio.gather(
+            *(self.client.get(self._health_url, timeout=HEALTH_CHECK_TIMEOUT)
+              for _ in range(min(WARMUP_CONNECTIONS, settings.CONNECTION_POOL_SIZE))),
+            return_exceptions=True
+        )
+        failures = [r for r in responses if isinstance(r, Exception)]
+        if failures:
+            logger.warning(f"Connection warmup failed for {self.__class__.__name__}",
+                          url=self.base_url, failed=len(failures), error=str(failures[0]))
+    
     async def shutdown(self):
-        """Shutdown the adapter"""
-        await self.client.aclose()
+        """Shutdown the adapter (the shared client is closed by the service)"""
         self._initialized = False
     
+    @property
+    def circuit_open(self) -> bool:
+        """Whether requests to this backend are currently short-circuited"""
+        return time.monotonic() < self._open_until
+    
+    def _record_outcome(self, ok: bool):
+        """Reset the breaker on success; open it with exponential backoff on repeated failure"""
+        if ok:
+            self._consec_failures = 0
+            return
+        
+        self._consec_failures += 1
+        threshold = self._config.get("failure_threshold", CIRCUIT_FAILURE_THRESHOLD)
+        if self._consec_failures >= threshold:
+            backoff = min(CIRCUIT_MAX_OPEN, 2 ** (self._consec_failures - threshold))
+            self._open_until = time.monotonic() + backoff
+            logger.warning(f"Circuit opened for {self.__class__.__name__}",
+                          failures=self._consec_failures, retry_in=backoff)
+    
+    async def _post(self, url: httpx.URL, **kwargs) -> httpx.Response:
+        """POST under the backend timeout, feeding the circuit breaker"""
+        if self.circuit_open:
+            raise CircuitOpenError(f"{self.name} circuit is open")
+        
+        try:
+            response = await self.client.post(url, timeout=self._timeout, **kwargs)
+        except Exception:
+            self._record_outcome(False)
+            raise
+        self._record_outcome(response.status_code < 500)
+        return response
+    
+    def _hedge_delay(self) -> float:
+        """Configured hedge delay, else the p95 of recent search latency"""
+        hedge_after_ms = self._config.get("hedge_after_ms")
+        if hedge_after_ms is not None:
+            return hedge_after_ms / 1000
+        
+        if len(self._latencies) < MIN_LATENCY_SAMPLES:
+            return DEFAULT_HEDGE_AFTER
+        
+        ordered = sorted(self._latencies)
+        return ordered[int(0.95 * (len(ordered) - 1))]
+    
+    async def _fetch_results(self, body: bytes, headers: Dict[str, str], key: Optional[str]) -> Any:
+        """POST a search and decode it, parsing NDJSON line by line as the body arrives"""
+        request = self.client.build_request(
+            "POST", self._search_url, content=body, headers=headers, timeout=self._timeout
+        )
+        response = await self.client.send(request, stream=True)
+        try:
+            response.raise_for_status()
+            if response.headers.get("content-type", "").startswith(NDJSON_CONTENT_TYPE):
+                return [orjson.loads(line) async for line in response.aiter_lines() if line]
+            
+            # Legacy application/json body
+            data = orjson.loads(await response.aread())
+            return data.get(key, []) if key else data
+        finally:
+            await response.aclose()
+    
+    async def _hedged(self, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        """Run an idempotent request, hedging with a duplicate if it runs slow; first success wins"""
+        start = time.monotonic()
+        tasks = [asyncio.create_task(fetch())]
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=self._hedge_delay())
+            if not done:
+                tasks.append(asyncio.create_task(fetch()))
+            
+            pending = set(tasks)
+            error = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        self._latencies.append(time.monotonic() - start)
+                        self._record_outcome(True)
+                        return task.result()
+                    error = task.exception()
+            # Client errors mean the backend answered; only transport errors and 5xx count against it
+            self._record_outcome(
+                isinstance(error, httpx.HTTPStatusError) and error.response.status_code < 500
+            )
+            raise error
+        finally:
+            # Cancel the losing request (or both, if the caller was cancelled)
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+    
+    async def _search_results(self, body: bytes, key: Optional[str],
+                              headers: Dict[str, str] = SEARCH_HEADERS) -> Any:
+        """Hedged search returning decoded results; identical concurrent searches share one request"""
+        inflight_key = (body, headers.get("Authorization"))
+        task = self._inflight.get(inflight_key)
+        if task is None:
+            task = asyncio.create_task(
+                self._hedged(lambda: self._fetch_results(body, headers, key))
+            )
+            self._inflight[inflight_key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(inflight_key, None))
+        
+        # Shield so one cancelled caller doesn't cancel the request for the others
+        return await asyncio.shield(task)
+    
     @abstractmethod
     async def search(self, query: str, options: Dict[str, Any]) -> List[Dict[str, Any]]:
         """Search the memory system"""
         pass
     
     @abstractmethod
-    async def store(self, content: str, metadata: Dict[str, Any]) -> str:
-        """Store content in the memory system"""
+    async def store(
+        self, content: str, metadata: Dict[str, Any], vector: Optional[List[float]] = None
+    ) -> str:
+        """Store content (and optionally its embedding) in the memory system"""
         pass
     
+    def _vector_fields(self, vector: Optional[List[float]]) -> Dict[str, Any]:
+        """Request fields carrying an embedding beside the metadata"""
+        if vector is None:
+            return {}
+        if self.PACKED_VECTORS:
+            return {"embedding_f16": _encode_vector(vector), "embedding_dim": len(vector)}
+        return {"embedding": vector}
+    
+    @property
+    def cached_health(self) -> Optional[bool]:
+        """Memoized health result if still fresh, else None (no coroutine needed)"""
+        if time.monotonic() - self._health_checked_at < HEALTH_CHECK_TTL:
+            return self._health
+        return None
+    
     async def health_check(self) -> bool:
         """Check if the memory system is healthy"""
+        healthy = self.cached_health
+        if healthy is not None:
+            return healthy
+        
         try:
-            response = await self.client.get(f"{self.base_url}/health")
-            return response.status_code == 200
+            response = await self.client.get(
+                self._health_url, timeout=HEALTH_CHECK_TIMEOUT
+            )
+            healthy = response.status_code == 200
         except Exception as e:
             logger.error(f"Health check failed for {self.__class__.__name__}", 
                         error=str(e))
-            return False
+            healthy = False
+        
+        self._health = healthy
+        self._health_checked_at = time.monotonic()
+        return healthy
 
 
 class CogneeAdapter(MemorySystemAdapter):
     """Adapter for Cognee semantic memory system"""
     
+    name = "cognee"
+    search_path = "/api/search"
+    store_path = "/api/add"
+    
     async def search(self, query: str, options: Dict[str, Any]) -> List[Dict[str, Any]]:
         """Search Cognee's semantic graph"""
+        if self.circuit_open:
+            return []
+        
         try:
-            response = await self.client.post(
-                f"{self.base_url}/api/search",
-                json={
+            results = await self._search_results(
+                _encode_json({
                     "query": query,
                     "limit": options.get("max_results", 10),
                     "include_graph": True,
                     "semantic_search": True
-                }
+                }),
+                "results"
             )
-            response.raise_for_status()
-            
-            results = response.json().get("results", [])
             
             # Transform Cognee results to standard format
-            transformed = []
-            for result in results:
-                transformed.append({
+            return [
+                {
                     "id": result.get("id"),
                     "content": result.get("content", ""),
                     "score": result.get("similarity_score", 0.0),
@@ -85,28 +349,32 @@ class CogneeAdapter(MemorySystemAdapter):
                         "keywords": result.get("keywords", [])
                     },
                     "highlights": result.get("highlights", [])
-                })
-            
-            return transformed
+                }
+                for result in results
+            ]
             
         except Exception as e:
             logger.error("Cognee search failed", query=query, error=str(e))
             return []
     
-    async def store(self, content: str, metadata: Dict[str, Any]) -> str:
+    async def store(
+        self, content: str, metadata: Dict[str, Any], vector: Optional[List[float]] = None
+    ) -> str:
         """Store content in Cognee"""
         try:
-            response = await self.client.post(
-                f"{self.base_url}/api/add",
-                json={
+            response = await self._post(
+                self._store_url,
+                content=_encode_json({
                     "content": content,
                     "metadata": metadata,
-                    "process_graph": True
-                }
+                    "process_graph": True,
+                    **self._vector_fields(vector)
+                }),
+                headers=JSON_HEADERS
             )
             response.raise_for_status()
             
-            return response.json().get("id", "")
+            return orjson.loads(response.content).get("id", "")
             
         except Exception as e:
             logger.error("Cognee store failed", error=str(e))
@@ -116,24 +384,27 @@ class CogneeAdapter(MemorySystemAdapter):
 class MementoAdapter(MemorySystemAdapter):
     """Adapter for Memento MCP key-value memory"""
     
+    name = "memento"
+    search_path = "/search"
+    store_path = "/store"
+    
     async def search(self, query: str, options: Dict[str, Any]) -> List[Dict[str, Any]]:
         """Search Memento's key-value store"""
+        if self.circuit_open:
+            return []
+        
         try:
-            response = await self.client.post(
-                f"{self.base_url}/search",
-                json={
+            results = await self._search_results(
+                _encode_json({
                     "query": query,
                     "limit": options.get("max_results", 10)
-                }
+                }),
+                "memories"
             )
-            response.raise_for_status()
-            
-            results = response.json().get("memories", [])
             
             # Transform Memento results
-            transformed = []
-            for result in results:
-                transformed.append({
+            return [
+                {
                     "id": result.get("key"),
                     "content": result.get("value", ""),
                     "score": result.get("relevance", 0.0),
@@ -142,26 +413,31 @@ class MementoAdapter(MemorySystemAdapter):
                         "timestamp": result.get("timestamp"),
                         "tags": result.get("tags", [])
                     }
-                })
-            
-            return transformed
+                }
+                for result in results
+            ]
             
         except Exception as e:
             logger.error("Memento search failed", query=query, error=str(e))
             return []
     
-    async def store(self, content: str, metadata: Dict[str, Any]) -> str:
+    async def store(
+        self, content: str, metadata: Dict[str, Any], vector: Optional[List[float]] = None
+    ) -> str:
         """Store content in Memento"""
         try:
-            key = metadata.get("key", f"memory_{hash(content)}")
+            # Content-addressed so identical content maps to one key across processes
+            key = metadata.get("key") or f"memory_{blake2b(content.encode(), digest_size=16).hexdigest()}"
             
-            response = await self.client.post(
-                f"{self.base_url}/store",
-                json={
+            response = await self._post(
+                self._store_url,
+                content=_encode_json({
                     "key": key,
                     "value": content,
-                    "metadata": metadata
-                }
+                    "metadata": metadata,
+                    **self._vector_fields(vector)
+                }),
+                headers=JSON_HEADERS
             )
             response.raise_for_status()
             
@@ -175,28 +451,33 @@ class MementoAdapter(MemorySystemAdapter):
 class MemOSAdapter(MemorySystemAdapter):
     """Adapter for MemOS multi-type memory system"""
     
+    name = "memos"
+    search_path = "/api/search"
+    store_path = "/api/add"
+    
     async def search(self, query: str, options: Dict[str, Any]) -> List[Dict[str, Any]]:
         """Search MemOS memory cubes"""
+        if self.circuit_open:
+            return []
+        
         try:
             user_id = options.get("user_id", "default")
             
-            response = await self.client.post(
-                f"{self.base_url}/api/search",
-                json={
+            # Results are split by memory type, so this stays a single JSON document
+            data = await self._search_results(
+                _encode_json({
                     "query": query,
                     "user_id": user_id,
                     "limit": options.get("max_results", 10),
                     "memory_types": ["text_mem", "act_mem"]
-                }
+                }),
+                None,
+                headers=JSON_HEADERS
             )
-            response.raise_for_status()
-            
-            data = response.json()
-            results = []
             
             # Process text memories
-            for mem in data.get("text_mem", []):
-                results.append({
+            results = [
+                {
                     "id": mem.get("id"),
                     "content": mem.get("content", ""),
                     "score": mem.get("score", 0.0),
@@ -207,11 +488,13 @@ class MemOSAdapter(MemorySystemAdapter):
                         "cube_id": mem.get("cube_id"),
                         "timestamp": mem.get("timestamp")
                     }
-                })
+                }
+                for mem in data.get("text_mem", [])
+            ]
             
             # Process activation memories if any
-            for mem in data.get("act_mem", []):
-                results.append({
+            results.extend(
+                {
                     "id": mem.get("id"),
                     "content": mem.get("summary", ""),
                     "score": mem.get("score", 0.0),
@@ -221,7 +504,9 @@ class MemOSAdapter(MemorySystemAdapter):
                         "kv_cache": mem.get("kv_data"),
                         "context_length": mem.get("context_length")
                     }
-                })
+                }
+                for mem in data.get("act_mem", [])
+            )
             
             return results
             
@@ -229,24 +514,28 @@ class MemOSAdapter(MemorySystemAdapter):
             logger.error("MemOS search failed", query=query, error=str(e))
             return []
     
-    async def store(self, content: str, metadata: Dict[str, Any]) -> str:
+    async def store(
+        self, content: str, metadata: Dict[str, Any], vector: Optional[List[float]] = None
+    ) -> str:
         """Store content in MemOS"""
         try:
             user_id = metadata.get("user_id", "default")
             
-            response = await self.client.post(
-                f"{self.base_url}/api/add",
-                json={
+            response = await self._post(
+                self._store_url,
+                content=_encode_json({
                     "messages": [
                         {"role": "system", "content": content}
                     ],
                     "user_id": user_id,
-                    "metadata": metadata
-                }
+                    "metadata": metadata,
+                    **self._vector_fields(vector)
+                }),
+                headers=JSON_HEADERS
             )
             response.raise_for_status()
             
-            return response.json().get("memory_id", "")
+            return orjson.loads(response.content).get("memory_id", "")
             
         except Exception as e:
             logger.error("MemOS store failed", error=str(e))
@@ -256,29 +545,33 @@ class MemOSAdapter(MemorySystemAdapter):
 class LlamaCloudAdapter(MemorySystemAdapter):
     """Adapter for LlamaCloud document index"""
     
+    name = "llamacloud"
+    search_path = "/mcp/tools/query_main-docs"
+    store_path = "/api/ingest"
+    
     async def search(self, query: str, options: Dict[str, Any]) -> List[Dict[str, Any]]:
         """Search LlamaCloud indexes"""
+        if self.circuit_open:
+            return []
+        
         try:
             # Use MCP interface for LlamaCloud
-            response = await self.client.post(
-                f"{self.base_url}/mcp/tools/query_main-docs",
-                json={
+            results = await self._search_results(
+                _encode_json({
                     "query": query,
                     "top_k": options.get("max_results", 10),
                     "filters": options.get("filters", {})
-                },
+                }),
+                "results",
                 headers={
+                    **SEARCH_HEADERS,
                     "Authorization": f"Bearer {options.get('api_key', '')}"
                 }
             )
-            response.raise_for_status()
-            
-            results = response.json().get("results", [])
             
             # Transform LlamaCloud results
-            transformed = []
-            for result in results:
-                transformed.append({
+            return [
+                {
                     "id": result.get("doc_id"),
                     "content": result.get("text", ""),
                     "score": result.get("score", 0.0),
@@ -290,30 +583,34 @@ class LlamaCloudAdapter(MemorySystemAdapter):
                         "index_name": result.get("index_name", "main-docs")
                     },
                     "highlights": result.get("highlights", [])
-                })
-            
-            return transformed
+                }
+                for result in results
+            ]
             
         except Exception as e:
             logger.error("LlamaCloud search failed", query=query, error=str(e))
             return []
     
-    async def store(self, content: str, metadata: Dict[str, Any]) -> str:
+    async def store(
+        self, content: str, metadata: Dict[str, Any], vector: Optional[List[float]] = None
+    ) -> str:
         """Store document in LlamaCloud"""
         try:
             # LlamaCloud typically ingests documents through pipelines
             # This would integrate with LlamaParse
-            response = await self.client.post(
-                f"{self.base_url}/api/ingest",
-                json={
+            response = await self._post(
+                self._store_url,
+                content=_encode_json({
                     "content": content,
                     "metadata": metadata,
-                    "index_name": metadata.get("index_name", "main-docs")
-                }
+                    "index_name": metadata.get("index_name", "main-docs"),
+                    **self._vector_fields(vector)
+                }),
+                headers=JSON_HEADERS
             )
             response.raise_for_status()
             
-            return response.json().get("document_id", "")
+            return orjson.loads(response.content).get("document_id", "")
             
         except Exception as e:
             logger.error("LlamaCloud store failed", error=str(e))
@@ -4,47 +4,123 @@ Cache implementation for query results
 
 import asyncio
 import time
-from typing import Dict, Any, Optional
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, Any, List, Optional
 from collections import OrderedDict
 
 import aiocache
+import cachetools
+import msgpack
+import numpy as np
+import structlog
 from aiocache import Cache
-from aiocache.serializers import JsonSerializer
+from aiocache.serializers import BaseSerializer
 
-from .config import settings
+from .config import (
+    settings, QUERY_CACHE_CFG,
+    REDIS_HOST, REDIS_PORT, REDIS_DB, REDIS_PASSWORD
+)
+
+logger = structlog.get_logger()
+
+
+def _msgpack_default(value: Any) -> Any:
+    """Pack pydantic models (e.g. QueryResult) and datetimes that msgpack can't handle natively"""
+    if hasattr(value, "model_dump"):
+        return value.model_dump(mode="json")
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Type is not msgpack serializable: {type(value).__name__}")
+
+
+class MsgPackSerializer(BaseSerializer):
+    """aiocache serializer backed by msgpack (smaller and faster than JSON for result payloads)"""
+    
+    # Values round-trip as raw bytes
+    DEFAULT_ENCODING = None
+    
+    def dumps(self, value: Any) -> bytes:
+        return msgpack.packb(value, use_bin_type=True, default=_msgpack_default)
+    
+    def loads(self, value: Optional[bytes]) -> Any:
+        if value is None:
+            return None
+        return msgpack.unpackb(value, raw=False)
+
+
+class LocalTTLStore:
+    """In-process store with the subset of aiocache's interface QueryCache uses"""
+    
+    def __init__(self, maxsize: int, ttl: int):
+        self.ttl = ttl
+        # Entries are (value, ttl) so each key can carry its own expiry
+        self._data = cachetools.TLRUCache(
+            maxsize=maxsize,
+            ttu=lambda _key, entry, now: now + entry[1]
+        )
+    
+    async def get(self, key: str) -> Any:
+        entry = self._data.get(key)
+        return entry[0] if entry is not None else None
+    
+    async def set(self, key: str, value: Any, ttl: Optional[int] = None):
+        self._data[key] = (value, ttl or self.ttl)
+    
+    async def multi_get(self, keys: List[str]) -> List[Any]:
+        entries = [self._data.get(key) for key in keys]
+        return [entry[0] if entry is not None else None for entry in entries]
+    
+    async def multi_set(self, pairs: List[tuple], ttl: Optional[int] = None):
+        for key, value in pairs:
+            self._data[key] = (value, ttl or self.ttl)
+    
+    async def clear(self):
+        self._data.clear()
 
 
 class QueryCache:
     """LRU cache for query results"""
     
     def __init__(self):
-        cache_config = settings.CACHE_CONFIG.get("query_cache", {})
-        
         # Use aiocache with Redis backend if available
         if settings.REDIS_URL:
             self.cache = Cache(
                 Cache.REDIS,
-                endpoint=settings.REDIS_URL.split("://")[1].split(":")[0],
-                port=int(settings.REDIS_URL.split(":")[-1]),
-                ttl=cache_config.get("ttl", 300),
-                serializer=JsonSerializer()
+                endpoint=REDIS_HOST,
+                port=REDIS_PORT,
+                db=REDIS_DB,
+                password=REDIS_PASSWORD,
+                ttl=QUERY_CACHE_CFG.ttl,
+                serializer=MsgPackSerializer()
             )
         else:
-            # Fallback to memory cache
-            self.cache = Cache(
-                Cache.MEMORY,
-                ttl=cache_config.get("ttl", 300),
-                serializer=JsonSerializer()
+            # Fallback to an in-process store (no serializer round-trip)
+            self.cache = LocalTTLStore(
+                maxsize=QUERY_CACHE_CFG.max_size,
+                ttl=QUERY_CACHE_CFG.ttl
             )
         
-        self.max_size = cache_config.get("max_size", 1000)
+        self.max_size = QUERY_CACHE_CFG.max_size
         self.hits = 0
         self.misses = 0
+        
+        # In-process L1 in front of Redis; shorter TTL bounds cross-process staleness
+        self.l1_ttl = max(QUERY_CACHE_CFG.ttl // 2, 1)
+        self.l1 = cachetools.TTLCache(maxsize=self.max_size, ttl=self.l1_ttl)
+        
+        # Keys currently being computed, so concurrent misses share one computation
+        self._inflight: Dict[str, asyncio.Task] = {}
+    
+    def get_local(self, key: str) -> Optional[Dict[str, Any]]:
+        """Synchronous L1 lookup, so hot callers skip creating a coroutine on a hit"""
+        result = self.l1.get(key)
+        if result is not None:
+            self.hits += 1
+        return result
     
     async def get(self, key: str) -> Optional[Dict[str, Any]]:
-        """Get item from cache"""
-        result = await self.cache.get(key)
-        
+        """Get item from cache (L1, then the shared backend)"""
+        result = await self.peek(key)
         if result:
             self.hits += 1
         else:
@@ -52,12 +128,104 @@ class QueryCache:
         
         return result
     
+    async def peek(self, key: str) -> Optional[Dict[str, Any]]:
+        """Like get(), without counting toward the hit/miss stats"""
+        result = self.l1.get(key)
+        if result is not None:
+            return result
+        
+        result = await self.cache.get(key)
+        if result:
+            self.l1[key] = result
+        return result
+    
     async def set(self, key: str, value: Dict[str, Any], ttl: Optional[int] = None):
         """Set item in cache"""
         await self.cache.set(key, value, ttl=ttl)
+        
+        # Short-lived entries skip L1 so they can't outlive their own TTL there
+        if ttl is None or ttl >= self.l1_ttl:
+            self.l1[key] = value
+        else:
+            self.l1.pop(key, None)
+    
+    async def get_negative(self, key: str) -> bool:
+        """Whether a negative marker is set; skips L1 and the hit/miss counters"""
+        return bool(await self.cache.get(key))
+    
+    async def set_negative(self, key: str, ttl: int):
+        """Set a short-lived negative marker in the backend only, so L1 can't extend it"""
+        await self.cache.set(key, True, ttl=ttl)
+    
+    async def get_or_compute(
+        self,
+        key: str,
+        producer: Callable[[], Awaitable[Dict[str, Any]]],
+        ttl: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Compute and cache a value for a key the caller already missed on.
+        
+        Concurrent callers for the same key await a single producer run.
+        """
+        result = self.l1.get(key)
+        if result is not None:
+            return result
+        
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._compute(key, producer, ttl))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        
+        # Shield so one caller's cancellation doesn't abort the shared computation
+        return await asyncio.shield(task)
+    
+    async def _compute(
+        self,
+        key: str,
+        producer: Callable[[], Awaitable[Dict[str, Any]]],
+        ttl: Optional[int]
+    ) -> Dict[str, Any]:
+        """Run the producer and store its result"""
+        value = await producer()
+        await self.set(key, value, ttl=ttl)
+        return value
+    
+    async def mget(self, keys: List[str]) -> List[Optional[Dict[str, Any]]]:
+        """Get several items in one round-trip (a single MGET on Redis)"""
+        if not keys:
+            return []
+        
+        # Serve what L1 has; fetch only the rest
+        results = [self.l1.get(key) for key in keys]
+        missing = [i for i, result in enumerate(results) if result is None]
+        if missing:
+            fetched = await self.cache.multi_get([keys[i] for i in missing])
+            for i, result in zip(missing, fetched):
+                results[i] = result
+                if result:
+                    self.l1[keys[i]] = result
+        
+        hits = sum(1 for result in results if result)
+        self.hits += hits
+        self.misses += len(results) - hits
+        
+        return results
+    
+    async def mset(self, items: Dict[str, Dict[str, Any]], ttl: Optional[int] = None):
+        """Set several items in one round-trip (one pipelined MSET on Redis)"""
+        if items:
+            await self.cache.multi_set(list(items.items()), ttl=ttl)
+            if ttl is None or ttl >= self.l1_ttl:
+                self.l1.update(items)
+            else:
+                for key in items:
+                    self.l1.pop(key, None)
     
     async def clear(self):
         """Clear all cache entries"""
+        self.l1.clear()
         await self.cache.clear()
     
     def get_stats(self) -> Dict[str, Any]:
@@ -70,4 +238,102 @@ class QueryCache:
             "misses": self.misses,
             "hit_rate": hit_rate,
             "total_requests": total_requests
-        }
\ No newline at end of file
+        }
+
+
+class SemanticQueryCache:
+    """Semantic tier over QueryCache: near-duplicate queries reuse a cached entry"""
+    
+    def __init__(self, cache: QueryCache, embedder):
+        semantic_config = settings.CACHE_CONFIG.get("semantic_cache", {})
+        embedding_config = settings.CACHE_CONFIG.get("embedding_cache", {})
+        
+        self.cache = cache
+        self.embedder = embedder
+        self.threshold = semantic_config.get("similarity_threshold", 0.92)
+        self.min_query_length = semantic_config.get("min_query_length", 16)
+        self.max_entries = cache.max_size
+        
+        # Query text -> normalized embedding (LRU)
+        self.embedding_cache: OrderedDict = OrderedDict()
+        self.embedding_cache_size = embedding_config.get("max_size", 10000)
+        
+        # Flat inner-product index: row i holds the vector for keys[i], used as a ring
+        self._matrix: Optional[np.ndarray] = None
+        self._keys: List[Optional[str]] = [None] * self.max_entries
+        self._scopes: List[Optional[str]] = [None] * self.max_entries
+        self._count = 0
+        self._next = 0
+        self.hits = 0
+    
+    async def _embed(self, query: str) -> Optional[np.ndarray]:
+        """Embed a query, L2-normalized, reusing cached embeddings"""
+        vector = self.embedding_cache.get(query)
+        if vector is not None:
+            self.embedding_cache.move_to_end(query)
+            return vector
+        
+        try:
+            raw = await self.embedder.aget_query_embedding(query)
+        except Exception as e:
+            logger.warning("Query embedding failed", error=str(e))
+            return None
+        
+        vector = np.asarray(raw, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        if norm == 0:
+            return None
+        vector /= norm
+        
+        self.embedding_cache[query] = vector
+        if len(self.embedding_cache) > self.embedding_cache_size:
+            self.embedding_cache.popitem(last=False)
+        return vector
+    
+    async def get(self, query: str, scope: str) -> Optional[Dict[str, Any]]:
+        """Return the cached entry for the most similar query in the same scope"""
+        # Skip the embedding call when no lookup could pay for it
+        if len(query) < self.min_query_length or scope not in self._scopes:
+            return None
+        
+        vector = await self._embed(query)
+        if vector is None or vector.shape[0] != self._matrix.shape[1]:
+            return None
+        
+        similarities = self._matrix[:self._count] @ vector
+        # Only compare against entries cached with the same mode/sources/options
+        in_scope = np.fromiter(
+            (s == scope for s in self._scopes[:self._count]), dtype=bool, count=self._count
+        )
+        similarities[~in_scope] = -1.0
+        
+        best = int(similarities.argmax())
+        if similarities[best] < self.threshold:
+            return None
+        
+        # The exact-key miss was already counted; only this tier counts a hit here
+        result = await self.cache.peek(self._keys[best])
+        if result:
+            self.hits += 1
+        return result
+    
+    async def add(self, query: str, scope: str, key: str):
+        """Index the query embedding for an entry already stored under key"""
+        if len(query) < self.min_query_length:
+            return
+        
+        vector = await self._embed(query)
+        if vector is None:
+            return
+        
+        if self._matrix is None:
+            self._matrix = np.zeros((self.max_entries, vector.shape[0]), dtype=np.float32)
+        elif vector.shape[0] != self._matrix.shape[1]:
+            return
+        
+        slot = self._next
+        self._matrix[slot] = vector
+        self._keys[slot] = key
+        self._scopes[slot] = scope
+        self._next = (slot + 1) % self.max_entries
+        self._count = min(self._count + 1, self.max_entries)
@@ -3,12 +3,19 @@ Document Processor - Handles document parsing and processing pipelines
 """
 
 import asyncio
+import multiprocessing
+import os
+import re
 import uuid
 import time
+from concurrent.futures import ProcessPoolExecutor
+from hashlib import blake2b
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+from collections import Counter, OrderedDict
 from datetime import datetime
 
+import cachetools
 import structlog
 from llama_parse import LlamaParse
 from llama_index.core import SimpleDirectoryReader
@@ -24,15 +31,215 @@ from .adapters import (
 
 logger = structlog.get_logger()
 
+try:
+    import re2  # google-re2: linear-time DFA matching for whole-document scans
+    RE2_AVAILABLE = True
+except ImportError:
+    RE2_AVAILABLE = False
+
+
+def _compile_scan(pattern: str):
+    """Compile a whole-document pattern with RE2 when installed, else stdlib re"""
+    return re2.compile(pattern) if RE2_AVAILABLE else re.compile(pattern)
+
+
+# Extraction patterns, compiled once at import (flags inline so RE2 honours them)
+_CITATION_AUTHOR_YEAR = _compile_scan(r'\(([A-Z][a-z]+(?:\s+(?:and|&)\s+[A-Z][a-z]+)*),\s*(\d{4})\)')
+_CITATION_NUM = _compile_scan(r'\[(\d+)\]')
+_CODE_BLOCK = _compile_scan(r'(?s)```(\w+)?\n(.*?)```')
+# "import x" and "from x import ..." lines in one pass
+_PY_IMPORT = _compile_scan(r'(?m)^(?:import\s+(\S+)|from\s+(\S+)\s+import)')
+_SECTION = _compile_scan(r'(?m)^(\d+(?:\.\d+)*)\s+([^\n]+)')
+# Word-boundary patterns stay on stdlib re: RE2's \b and \w are ASCII-only
+_CAP_WORD = re.compile(r'\b[A-Z][a-z]+(?:\s+[A-Z][a-z]+)*\b')
+# Maximal runs of 4+ word characters, i.e. \b\w+\b filtered to len > 3
+_KEYWORD = re.compile(r'\w{4,}')
+
+COMMON_WORDS = frozenset({"The", "This", "That", "These", "Those", "A", "An"})
+STOPWORDS = frozenset({"the", "a", "an", "and", "or", "but", "in", "on", "at", "to", "for"})
+
+# Clause type -> title terms, checked in order
+CLAUSE_TYPES = (
+    ("privacy", ("privacy", "data protection", "gdpr")),
+    ("liability", ("liability", "limitation", "disclaimer")),
+    ("financial", ("payment", "fee", "pricing")),
+    ("termination", ("termination", "cancellation")),
+)
+REQUIRED_CLAUSES = ("privacy", "data protection", "liability")
+
+MAX_ENTITIES = 50
+
+
+# Steps that must finish before a step can start; dependencies absent from a
+# pipeline are ignored, and "store" always runs after every other step
+STEP_DEPENDENCIES: Dict[str, Set[str]] = {
+    "chunk": {"parse"},
+    "embed": {"chunk"},
+    "enrich": {"parse"},
+    "citations": {"parse"},
+    "syntax_highlight": {"parse"},
+    "dependency_analysis": {"syntax_highlight"},
+    "clause_extraction": {"parse"},
+    "compliance_check": {"clause_extraction"},
+}
+
+
+# CPU-bound analysis, kept at module level so it can run in the process pool
+
+def _find_citations(content: str) -> Dict[str, Any]:
+    """Find (Author, Year) and [Number] style citations"""
+    # Simple citation extraction (would use more sophisticated NLP in production)
+    author_year = _CITATION_AUTHOR_YEAR.findall(content)
+    ref_numbers = _CITATION_NUM.findall(content)
+    
+    return {
+        "author_year": author_year,
+        "numbered": ref_numbers,
+        "total_count": len(author_year) + len(ref_numbers)
+    }
+
+
+def _find_code_blocks(content: str) -> List[Dict[str, str]]:
+    """Find fenced code blocks and their languages"""
+    # This would use a proper syntax highlighter in production
+    return [
+        {"language": lang or "unknown", "code": code}
+        for lang, code in _CODE_BLOCK.findall(content)
+    ]
+
+
+def _find_dependencies(code_blocks: List[Dict[str, str]]) -> Dict[str, List[str]]:
+    """Collect Python imports from code blocks (simplified)"""
+    imports = []
+    for block in code_blocks:
+        imports.extend(
+            module or from_module
+            for module, from_module in _PY_IMPORT.findall(block.get("code", ""))
+        )
+    
+    return {
+        "imports": list(set(imports)),
+        "packages": [],
+        "functions": []
+    }
+
+
+def _find_clauses(content: str) -> List[Dict[str, str]]:
+    """Find numbered sections and classify them as clauses"""
+    # This would use NLP for clause extraction in production
+    return [
+        {
+            "number": number,
+            "title": title.strip(),
+            "type": _classify_clause(title)
+        }
+        for number, title in _SECTION.findall(content)
+    ]
+
+
+def _classify_clause(title: str) -> str:
+    """Classify clause type based on title"""
+    title_lower = title.lower()
+    
+    # Plain loops over the prebuilt table; earlier types take precedence
+    for clause_type, terms in CLAUSE_TYPES:
+        for term in terms:
+            if term in title_lower:
+                return clause_type
+    return "general"
+
+
+def _extract_entities(content: str) -> List[str]:
+    """Extract named entities from content"""
+    # This would use NER in production
+    # For now, extract capitalized words: the first 50 distinct, then stop scanning
+    entities: Dict[str, None] = {}
+    for match in _CAP_WORD.finditer(content):
+        word = match.group()
+        if word not in COMMON_WORDS:
+            entities[word] = None
+            if len(entities) == MAX_ENTITIES:
+                break
+    
+    return list(entities)
+
+
+def _extract_keywords(content: str) -> List[str]:
+    """Extract keywords from content"""
+    # This would use TF-IDF or similar in production
+    # For now, count words longer than 3 characters straight off the scanner
+    word_counts = Counter(map(re.Match.group, _KEYWORD.finditer(content.lower())))
+    
+    # Filter common words
+    for stopword in STOPWORDS:
+        word_counts.pop(stopword, None)
+    
+    return [word for word, _ in word_counts.most_common(20)]
+
+
+def _analyze_content(content: str) -> Tuple[List[str], List[str], int]:
+    """Entities, keywords and word count for the enrich step"""
+    return _extract_entities(content), _extract_keywords(content), len(content.split())
+
+
+# Whole-document analysis behind each pipeline step; a document's analyses run
+# together in one worker call, so its text is pickled to the pool only once
+CONTENT_ANALYSES: Dict[str, Callable[[str], Any]] = {
+    "enrich": _analyze_content,
+    "citations": _find_citations,
+    "syntax_highlight": _find_code_blocks,
+    "clause_extraction": _find_clauses,
+}
+
+
+def _analyze_document(content: str, steps: Tuple[str, ...]) -> Dict[str, Any]:
+    """Run the content analyses for the given steps over one copy of the text"""
+    return {step: CONTENT_ANALYSES[step](content) for step in steps}
+
+
+def _file_digest(file_path: str) -> str:
+    """Content hash of a file, read in blocks"""
+    digest = blake2b(digest_size=16)
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
 
 class DocumentProcessor:
     """Processes documents through configurable pipelines"""
     
     def __init__(self):
         self.parser = None
+        self.splitter = None
         self.embedder = None
-        self.tasks: Dict[str, DocumentStatus] = {}
+        # Oldest first, so finished tasks can be evicted once MAX_TRACKED_TASKS is exceeded
+        self.tasks: "OrderedDict[str, DocumentStatus]" = OrderedDict()
+        
+        # Running totals, so stats cover evicted tasks and don't rescan the table
+        self._tasks_started = 0
+        self._tasks_completed = 0
+        self._tasks_failed = 0
+        self._total_processing_time = 0.0
+        # Monotonic start per running task; durations don't depend on the wall clock
+        self._started_ns: Dict[str, int] = {}
         self.adapters: Dict[str, Any] = {}
+        self._store_sem: Optional[asyncio.Semaphore] = None
+        self._embed_sem: Optional[asyncio.Semaphore] = None
+        self._cpu_pool: Optional[ProcessPoolExecutor] = None
+        
+        # Chunk text hash -> embedding, so re-processed content skips the API
+        embedding_config = settings.CACHE_CONFIG.get("embedding_cache", {})
+        self._embed_cache = cachetools.TTLCache(
+            maxsize=embedding_config.get("max_size", 10000),
+            ttl=embedding_config.get("ttl", 86400)
+        )
+        # File content hash -> parsed documents, so retries and re-runs skip LlamaParse
+        document_config = settings.CACHE_CONFIG.get("document_cache", {})
+        self._parse_cache = cachetools.TTLCache(
+            maxsize=document_config.get("max_size", 100),
+            ttl=document_config.get("ttl", 3600)
+        )
         self._initialized = False
     
     async def initialize(self):
@@ -45,10 +252,18 @@ class DocumentProcessor:
             **settings.LLAMAPARSE_CONFIG
         )
         
+        # Sentence splitter (and its tokenizer) is built once and reused per document
+        self.splitter = SentenceSplitter(
+            chunk_size=settings.CHUNK_SIZE,
+            chunk_overlap=settings.CHUNK_OVERLAP,
+            separator=" ",
+        )
+        
         # Initialize embedder if available
         if settings.OPENAI_API_KEY:
             self.embedder = OpenAIEmbedding(
-                api_key=settings.OPENAI_API_KEY
+                api_key=settings.OPENAI_API_KEY,
+                embed_batch_size=settings.EMBED_BATCH_SIZE
             )
         
         # Initialize storage adapters
@@ -63,6 +278,18 @@ class DocumentProcessor:
         init_tasks = [adapter.initialize() for adapter in self.adapters.values()]
         await asyncio.gather(*init_tasks)
         
+        # Worker processes for regex/counting analysis, keeping it off the event loop.
+        # Forkserver workers start clean instead of forking this threaded server
+        # along with its held locks and open HTTP/Redis clients
+        self._cpu_pool = ProcessPoolExecutor(
+            max_workers=min(settings.ANALYSIS_WORKERS, os.cpu_count() or 1),
+            mp_context=multiprocessing.get_context("forkserver")
+        )
+        
+        # Bound concurrent chunk stores and embedding requests
+        self._store_sem = asyncio.Semaphore(settings.STORE_CONCURRENCY)
+        self._embed_sem = asyncio.Semaphore(settings.EMBED_CONCURRENCY)
+        
         self._initialized = True
         logger.info("Document Processor initialized")
     
@@ -74,6 +301,10 @@ class DocumentProcessor:
         shutdown_tasks = [adapter.shutdown() for adapter in self.adapters.values()]
         await asyncio.gather(*shutdown_tasks)
         
+        if self._cpu_pool:
+            self._cpu_pool.shutdown(wait=False, cancel_futures=True)
+            self._cpu_pool = None
+        
         self._initialized = False
     
     async def start_processing(
@@ -87,13 +318,17 @@ class DocumentProcessor:
         task_id = str(uuid.uuid4())
         
         # Create task status
+        now = datetime.utcnow()
         self.tasks[task_id] = DocumentStatus(
             task_id=task_id,
             status="queued",
             progress=0.0,
-            started_at=datetime.utcnow(),
-            updated_at=datetime.utcnow()
+            started_at=now,
+            updated_at=now
         )
+        self._started_ns[task_id] = time.monotonic_ns()
+        self._tasks_started += 1
+        self._evict_finished_tasks()
         
         # Start processing in background
         asyncio.create_task(
@@ -113,6 +348,8 @@ class DocumentProcessor:
         store_in: Optional[List[MemorySource]]
     ):
         """Process document through pipeline"""
+        # The content analyses this pipeline needs, started once parsing is done
+        analysis: Optional[asyncio.Task] = None
         try:
             # Update status
             self._update_task_status(task_id, "processing", 0.0, "Starting pipeline")
@@ -121,39 +358,36 @@ class DocumentProcessor:
             steps = settings.DOCUMENT_PIPELINES.get(pipeline, ["parse"])
             total_steps = len(steps)
             
-            # Execute pipeline
+            # Execute pipeline: each round runs every step whose dependencies are done
             result = {"file_path": file_path}
+            pending = list(steps)
+            done = set()
+            analysis_steps = tuple(step for step in steps if step in CONTENT_ANALYSES)
             
-            for i, step in enumerate(steps):
+            while pending:
+                ready = [step for step in pending if self._step_ready(step, steps, pending, done)]
+                
                 self._update_task_status(
                     task_id, "processing", 
-                    (i / total_steps) * 100,
-                    f"Executing step: {step}"
+                    (len(done) / total_steps) * 100,
+                    f"Executing step: {', '.join(ready)}"
                 )
                 
-                if step == "parse":
-                    result = await self._step_parse(result)
-                elif step == "chunk":
-                    result = await self._step_chunk(result)
-                elif step == "embed":
-                    result = await self._step_embed(result)
-                elif step == "enrich":
-                    result = await self._step_enrich(result)
-                elif step == "store":
-                    result = await self._step_store(result, store_in)
-                elif step == "citations":
-                    result = await self._step_extract_citations(result)
-                elif step == "syntax_highlight":
-                    result = await self._step_syntax_highlight(result)
-                elif step == "dependency_analysis":
-                    result = await self._step_dependency_analysis(result)
-                elif step == "clause_extraction":
-                    result = await self._step_extract_clauses(result)
-                elif step == "compliance_check":
-                    result = await self._step_compliance_check(result)
+                # Steps update the shared context in place, each writing its own keys
+                await asyncio.gather(*(
+                    self._run_step(step, result, store_in, analysis) for step in ready
+                ))
                 
                 # Update completed steps
-                self.tasks[task_id].steps_completed.append(step)
+                for step in ready:
+                    pending.remove(step)
+                    done.add(step)
+                    self.tasks[task_id].steps_completed.append(step)
+                
+                if "parse" in ready and analysis_steps:
+                    analysis = asyncio.create_task(self._run_cpu(
+                        _analyze_document, result.get("content", ""), analysis_steps
+                    ))
             
             # Format output
             formatted_result = self._format_output(result, output_format)
@@ -173,16 +407,84 @@ class DocumentProcessor:
                 f"Error: {str(e)}"
             )
             self.tasks[task_id].errors.append(str(e))
+        finally:
+            if analysis:
+                analysis.cancel()
+    
+    def _step_ready(
+        self,
+        step: str,
+        steps: List[str],
+        pending: List[str],
+        done: set
+    ) -> bool:
+        """Whether a step's dependencies within this pipeline have completed"""
+        if step == "store":
+            # Store persists everything the pipeline produced, so it runs last
+            return all(other == "store" for other in pending)
+        
+        return all(
+            dep in done or dep not in steps
+            for dep in STEP_DEPENDENCIES.get(step, ())
+        )
+    
+    async def _run_step(
+        self,
+        step: str,
+        context: Dict[str, Any],
+        store_in: Optional[List[MemorySource]],
+        analysis: Optional[asyncio.Task] = None
+    ) -> Dict[str, Any]:
+        """Dispatch a single pipeline step"""
+        if step == "parse":
+            return await self._step_parse(context)
+        elif step == "chunk":
+            return await self._step_chunk(context)
+        elif step == "embed":
+            return await self._step_embed(context)
+        elif step == "enrich":
+            return await self._step_enrich(context, analysis)
+        elif step == "store":
+            return await self._step_store(context, store_in)
+        elif step == "citations":
+            return await self._step_extract_citations(context, analysis)
+        elif step == "syntax_highlight":
+            return await self._step_syntax_highlight(context, analysis)
+        elif step == "dependency_analysis":
+            return await self._step_dependency_analysis(context)
+        elif step == "clause_extraction":
+            return await self._step_extract_clauses(context, analysis)
+        elif step == "compliance_check":
+            return await self._step_compliance_check(context)
+        
+        return context
+    
+    async def _run_cpu(self, func: Callable[..., Any], *args) -> Any:
+        """Run a CPU-bound analysis function in the process pool"""
+        return await asyncio.get_running_loop().run_in_executor(self._cpu_pool, func, *args)
+    
+    async def _analysis_result(
+        self, step: str, context: Dict[str, Any], analysis: Optional[asyncio.Task]
+    ) -> Any:
+        """A step's share of the document's content analysis"""
+        if analysis is None:
+            # No parse step in this pipeline: analyse whatever content is present
+            analysis = self._run_cpu(_analyze_document, context.get("content", ""), (step,))
+        return (await analysis)[step]
     
     async def _step_parse(self, context: Dict[str, Any]) -> Dict[str, Any]:
         """Parse document using LlamaParse"""
         file_path = context["file_path"]
         
         logger.info("Parsing document", file_path=file_path)
-        start_time = time.time()
+        start_time = time.perf_counter()
         
-        # Parse document
-        documents = await self.parser.aload_data(file_path)
+        # Parse document, unless this exact content was parsed recently
+        content_key = await asyncio.to_thread(_file_digest, file_path)
+        documents = self._parse_cache.get(content_key)
+        if documents is None:
+            documents = await self.parser.aload_data(file_path)
+            self._parse_cache[content_key] = documents
         
         # Extract content
         content = "\n\n".join([doc.text for doc in documents])
@@ -197,24 +499,21 @@ class DocumentProcessor:
             "content": content,
             "documents": documents,
             "metadata": metadata,
-            "parsing_time": time.time() - start_time
+            "parsing_time": time.perf_counter() - start_time
         })
         
         return context
     
     async def _step_chunk(self, context: Dict[str, Any]) -> Dict[str, Any]:
         """Chunk document into smaller pieces"""
-        content = context.get("content", "")
-        
-        # Use sentence splitter
-        splitter = SentenceSplitter(
-            chunk_size=512,
-            chunk_overlap=128,
-            separator=" ",
-        )
-        
-        # Split content
-        chunks = splitter.split_text(content)
+        # Split each parsed document on its own, so the splitter never walks the joined content
+        documents = context.get("documents")
+        if documents:
+            chunks = []
+            for doc in documents:
+                chunks.extend(self.splitter.split_text(doc.text))
+        else:
+            chunks = self.splitter.split_text(context.get("content", ""))
         
         context["chunks"] = chunks
         context["chunk_count"] = len(chunks)
@@ -231,30 +530,59 @@ class DocumentProcessor:
         
         chunks = context.get("chunks", [context.get("content", "")])
         
-        # Generate embeddings
-        embeddings = await self.embedder.aget_text_embedding_batch(chunks)
+        # Serve previously embedded chunk texts from the cache
+        model_name = self.embedder.model_name
+        keys = [self._embedding_key(chunk, model_name) for chunk in chunks]
+        embeddings = [self._embed_cache.get(key) for key in keys]
+        missing = [i for i, vector in enumerate(embeddings) if vector is None]
+        
+        # Generate embeddings, one request per sub-batch with several in flight
+        async def embed_batch(batch: List[str]) -> List[List[float]]:
+            async with self._embed_sem:
+                return await self.embedder.aget_text_embedding_batch(batch)
+        
+        # Repeated chunk texts (headers, footers, boilerplate) are embedded once
+        first_index: Dict[str, int] = {}
+        for i in missing:
+            first_index.setdefault(keys[i], i)
+        uncached = [chunks[i] for i in first_index.values()]
+        
+        batch_size = settings.EMBED_BATCH_SIZE
+        batches = await asyncio.gather(*(
+            embed_batch(uncached[i:i + batch_size])
+            for i in range(0, len(uncached), batch_size)
+        ))
+        computed = dict(zip(first_index, (vector for batch in batches for vector in batch)))
+        
+        self._embed_cache.update(computed)
+        for i in missing:
+            embeddings[i] = computed[keys[i]]
         
         context["embeddings"] = embeddings
-        logger.info("Generated embeddings", count=len(embeddings))
+        logger.info("Generated embeddings", count=len(embeddings),
+                   cached=len(embeddings) - len(missing),
+                   embedded=len(uncached))
         
         return context
     
-    async def _step_enrich(self, context: Dict[str, Any]) -> Dict[str, Any]:
+    def _embedding_key(self, text: str, model_name: str) -> str:
+        """Cache key for a chunk's embedding under a given model"""
+        return f"{blake2b(text.encode(), digest_size=16).hexdigest()}:{model_name}"
+    
+    async def _step_enrich(
+        self, context: Dict[str, Any], analysis: Optional[asyncio.Task]
+    ) -> Dict[str, Any]:
         """Enrich document with additional metadata"""
-        content = context.get("content", "")
         metadata = context.get("metadata", {})
         
-        # Extract entities (simplified)
-        entities = self._extract_entities(content)
-        
-        # Extract keywords
-        keywords = self._extract_keywords(content)
+        # Extract entities and keywords (simplified) off the event loop
+        entities, keywords, word_count = await self._analysis_result("enrich", context, analysis)
         
         # Add enrichment data
         metadata.update({
             "entities": entities,
             "keywords": keywords,
-            "word_count": len(content.split()),
+            "word_count": word_count,
             "enriched_at": datetime.utcnow().isoformat()
         })
         
@@ -276,144 +604,81 @@ class DocumentProcessor:
         embeddings = context.get("embeddings", [])
         metadata = context.get("metadata", {})
         
-        storage_results = {}
+        # Built once per chunk and shared by every source (adapters only read metadata)
+        total_chunks = len(chunks)
+        chunk_metadata = [
+            {**metadata, "chunk_index": i, "total_chunks": total_chunks}
+            for i in range(total_chunks)
+        ]
         
-        for source in store_in:
-            if source not in self.adapters:
-                continue
+        async def store_chunk(adapter, i: int, chunk: str) -> str:
+            async with self._store_sem:
+                # Embeddings travel beside the metadata, not inside it
+                vector = embeddings[i] if i < len(embeddings) else None
+                return await adapter.store(chunk, chunk_metadata[i], vector)
+        
+        async def store_source(source: str) -> Dict[str, Any]:
+            adapter = self.adapters[source]
             
-            try:
-                adapter = self.adapters[source]
-                
-                # Store each chunk
-                chunk_ids = []
-                for i, chunk in enumerate(chunks):
-                    chunk_metadata = {
-                        **metadata,
-                        "chunk_index": i,
-                        "total_chunks": len(chunks)
-                    }
-                    
-                    # Add embedding if available
-                    if i < len(embeddings):
-                        chunk_metadata["embedding"] = embeddings[i]
-                    
-                    chunk_id = await adapter.store(chunk, chunk_metadata)
-                    chunk_ids.append(chunk_id)
-                
-                storage_results[source] = {
+            # Store all chunks concurrently
+            outcomes = await asyncio.gather(
+                *(store_chunk(adapter, i, chunk) for i, chunk in enumerate(chunks)),
+                return_exceptions=True
+            )
+            chunk_ids = [o for o in outcomes if not isinstance(o, Exception)]
+            errors = [o for o in outcomes if isinstance(o, Exception)]
+            
+            if not errors:
+                return {
                     "status": "success",
                     "chunks_stored": len(chunk_ids),
                     "ids": chunk_ids
                 }
-                
-            except Exception as e:
-                logger.error(f"Failed to store in {source}", error=str(e))
-                storage_results[source] = {
-                    "status": "failed",
-                    "error": str(e)
-                }
+            
+            logger.error(f"Failed to store in {source}", 
+                        error=str(errors[0]), failed_chunks=len(errors))
+            return {
+                "status": "partial" if chunk_ids else "failed",
+                "chunks_stored": len(chunk_ids),
+                "ids": chunk_ids,
+                "error": str(errors[0])
+            }
+        
+        sources = [source for source in store_in if source in self.adapters]
+        results = await asyncio.gather(*(store_source(source) for source in sources))
+        storage_results = dict(zip(sources, results))
         
         context["storage_results"] = storage_results
         logger.info("Document stored", results=storage_results)
         
         return context
     
-    async def _step_extract_citations(self, context: Dict[str, Any]) -> Dict[str, Any]:
+    async def _step_extract_citations(
+        self, context: Dict[str, Any], analysis: Optional[asyncio.Task]
+    ) -> Dict[str, Any]:
         """Extract citations from document"""
-        content = context.get("content", "")
-        
-        # Simple citation extraction (would use more sophisticated NLP in production)
-        citations = []
-        
-        # Look for common citation patterns
-        import re
-        
-        # Pattern for (Author, Year) style
-        pattern1 = r'\(([A-Z][a-z]+(?:\s+(?:and|&)\s+[A-Z][a-z]+)*),\s*(\d{4})\)'
-        citations.extend(re.findall(pattern1, content))
-        
-        # Pattern for [Number] style
-        pattern2 = r'\[(\d+)\]'
-        ref_numbers = re.findall(pattern2, content)
-        
-        context["citations"] = {
-            "author_year": citations,
-            "numbered": ref_numbers,
-            "total_count": len(citations) + len(ref_numbers)
-        }
-        
+        context["citations"] = await self._analysis_result("citations", context, analysis)
         return context
     
-    async def _step_syntax_highlight(self, context: Dict[str, Any]) -> Dict[str, Any]:
+    async def _step_syntax_highlight(
+        self, context: Dict[str, Any], analysis: Optional[asyncio.Task]
+    ) -> Dict[str, Any]:
         """Apply syntax highlighting to code blocks"""
-        content = context.get("content", "")
-        
-        # This would use a proper syntax highlighter in production
-        # For now, just identify code blocks
-        import re
-        
-        code_blocks = re.findall(r'```(\w+)?\n(.*?)```', content, re.DOTALL)
-        
-        context["code_blocks"] = [
-            {"language": lang or "unknown", "code": code}
-            for lang, code in code_blocks
-        ]
-        
+        context["code_blocks"] = await self._analysis_result("syntax_highlight", context, analysis)
         return context
     
     async def _step_dependency_analysis(self, context: Dict[str, Any]) -> Dict[str, Any]:
         """Analyze code dependencies"""
-        code_blocks = context.get("code_blocks", [])
-        
-        dependencies = {
-            "imports": [],
-            "packages": [],
-            "functions": []
-        }
-        
-        for block in code_blocks:
-            code = block.get("code", "")
-            
-            # Extract imports (simplified)
-            import re
-            
-            # Python imports
-            py_imports = re.findall(r'^import\s+(\S+)', code, re.MULTILINE)
-            py_from_imports = re.findall(r'^from\s+(\S+)\s+import', code, re.MULTILINE)
-            
-            dependencies["imports"].extend(py_imports + py_from_imports)
-        
-        # Deduplicate
-        dependencies["imports"] = list(set(dependencies["imports"]))
-        
-        context["dependencies"] = dependencies
-        
+        context["dependencies"] = await self._run_cpu(
+            _find_dependencies, context.get("code_blocks", [])
+        )
         return context
     
-    async def _step_extract_clauses(self, context: Dict[str, Any]) -> Dict[str, Any]:
+    async def _step_extract_clauses(
+        self, context: Dict[str, Any], analysis: Optional[asyncio.Task]
+    ) -> Dict[str, Any]:
         """Extract legal clauses from document"""
-        content = context.get("content", "")
-        
-        # This would use NLP for clause extraction in production
-        # For now, look for numbered sections
-        import re
-        
-        clauses = []
-        
-        # Pattern for numbered sections
-        section_pattern = r'^(\d+(?:\.\d+)*)\s+([^\n]+)'
-        matches = re.findall(section_pattern, content, re.MULTILINE)
-        
-        for number, title in matches:
-            clauses.append({
-                "number": number,
-                "title": title.strip(),
-                "type": self._classify_clause(title)
-            })
-        
-        context["clauses"] = clauses
-        
+        context["clauses"] = await self._analysis_result("clause_extraction", context, analysis)
         return context
     
     async def _step_compliance_check(self, context: Dict[str, Any]) -> Dict[str, Any]:
@@ -424,13 +689,12 @@ class DocumentProcessor:
         # Simple compliance checks
         compliance_issues = []
         
-        # Check for required clauses (example)
-        required_clauses = ["privacy", "data protection", "liability"]
+        # Check for required clauses (example); titles are single lines, so one
+        # substring search over the newline-joined titles can't match across two
+        clause_titles = "\n".join(c.get("title", "") for c in clauses).lower()
         
-        clause_titles = [c.get("title", "").lower() for c in clauses]
-        
-        for required in required_clauses:
-            if not any(required in title for title in clause_titles):
+        for required in REQUIRED_CLAUSES:
+            if required not in clause_titles:
                 compliance_issues.append({
                     "type": "missing_clause",
                     "severity": "medium",
@@ -444,56 +708,6 @@ class DocumentProcessor:
         
         return context
     
-    def _extract_entities(self, content: str) -> List[str]:
-        """Extract named entities from content"""
-        # This would use NER in production
-        # For now, extract capitalized words
-        import re
-        
-        words = re.findall(r'\b[A-Z][a-z]+(?:\s+[A-Z][a-z]+)*\b', content)
-        
-        # Filter common words
-        common_words = {"The", "This", "That", "These", "Those", "A", "An"}
-        entities = [w for w in words if w not in common_words]
-        
-        # Deduplicate and limit
-        return list(set(entities))[:50]
-    
-    def _extract_keywords(self, content: str) -> List[str]:
-        """Extract keywords from content"""
-        # This would use TF-IDF or similar in production
-        # For now, extract frequently occurring words
-        import re
-        from collections import Counter
-        
-        # Extract words
-        words = re.findall(r'\b\w+\b', content.lower())
-        
-        # Filter short and common words
-        stopwords = {"the", "a", "an", "and", "or", "but", "in", "on", "at", "to", "for"}
-        words = [w for w in words if len(w) > 3 and w not in stopwords]
-        
-        # Get most common
-        word_counts = Counter(words)
-        keywords = [word for word, _ in word_counts.most_common(20)]
-        
-        return keywords
-    
-    def _classify_clause(self, title: str) -> str:
-        """Classify clause type based on title"""
-        title_lower = title.lower()
-        
-        if any(term in title_lower for term in ["privacy", "data protection", "gdpr"]):
-            return "privacy"
-        elif any(term in title_lower for term in ["liability", "limitation", "disclaimer"]):
-            return "liability"
-        elif any(term in title_lower for term in ["payment", "fee", "pricing"]):
-            return "financial"
-        elif any(term in title_lower for term in ["termination", "cancellation"]):
-            return "termination"
-        else:
-            return "general"
-    
     def _format_output(
         self, 
         result: Dict[str, Any], 
@@ -557,32 +771,48 @@ class DocumentProcessor:
         task.status = status
         task.progress = progress
         task.current_step = current_step
-        task.updated_at = datetime.utcnow()
+        now = datetime.utcnow()
+        task.updated_at = now
         
         if result:
             task.result = result
         
         if status == "completed":
-            task.completed_at = datetime.utcnow()
+            task.completed_at = now
+            self._tasks_completed += 1
+            started_ns = self._started_ns.pop(task_id, None)
+            if started_ns is not None:
+                self._total_processing_time += (time.monotonic_ns() - started_ns) / 1e9
+        elif status == "failed":
+            self._tasks_failed += 1
+            self._started_ns.pop(task_id, None)
+        
+        # Progress is logged where it changes, so no per-task tracker is needed
+        logger.info("Processing progress",
+                   task_id=task_id,
+                   status=status,
+                   progress=progress,
+                   step=current_step)
+    
+    def _evict_finished_tasks(self):
+        """Drop the oldest completed/failed tasks beyond MAX_TRACKED_TASKS"""
+        excess = len(self.tasks) - settings.MAX_TRACKED_TASKS
+        if excess <= 0:
+            return
+        
+        finished = [
+            task_id for task_id, task in self.tasks.items()
+            if task.status in ("completed", "failed")
+        ]
+        for task_id in finished[:excess]:
+            del self.tasks[task_id]
     
     async def get_task_status(self, task_id: str) -> Optional[Dict[str, Any]]:
         """Get task status"""
         if task_id not in self.tasks:
             return None
         
-        return self.tasks[task_id].dict()
-    
-    async def track_processing(self, task_id: str):
-        """Track document processing progress"""
-        # This would implement real-time progress tracking
-        # For now, just log progress
-        while task_id in self.tasks and self.tasks[task_id].status == "processing":
-            task = self.tasks[task_id]
-            logger.info("Processing progress", 
-                       task_id=task_id,
-                       progress=task.progress,
-                       step=task.current_step)
-            await asyncio.sleep(5)
+        return self.tasks[task_id].model_dump()
     
     async def parse_document(self, file_path: str) -> Dict[str, Any]:
         """Parse a single document"""
@@ -597,22 +827,17 @@ class DocumentProcessor:
     
     async def get_stats(self) -> Dict[str, Any]:
         """Get document processing statistics"""
-        completed_tasks = [t for t in self.tasks.values() if t.status == "completed"]
-        failed_tasks = [t for t in self.tasks.values() if t.status == "failed"]
-        
-        # Calculate average processing time
-        processing_times = []
-        for task in completed_tasks:
-            if task.completed_at and task.started_at:
-                duration = (task.completed_at - task.started_at).total_seconds()
-                processing_times.append(duration)
-        
-        avg_time = sum(processing_times) / len(processing_times) if processing_times else 0
+        avg_time = (
+            self._total_processing_time / self._tasks_completed
+            if self._tasks_completed else 0
+        )
         
         return {
-            "total_processed": len(completed_tasks),
-            "total_failed": len(failed_tasks),
+            "total_processed": self._tasks_completed,
+            "total_failed": self._tasks_failed,
             "average_processing_time": avg_time,
-            "success_rate": len(completed_tasks) / len(self.tasks) if self.tasks else 0,
-            "active_tasks": len([t for t in self.tasks.values() if t.status == "processing"])
-        }
\ No newline at end of file
+            "success_rate": (
+                self._tasks_completed / self._tasks_started if self._tasks_started else 0
+            ),
+            "active_tasks": sum(1 for t in self.tasks.values() if t.status == "processing")
+        }
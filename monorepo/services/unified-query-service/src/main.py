@@ -5,17 +5,20 @@ Orchestrates queries across multiple memory systems
 
 import asyncio
 from contextlib import asynccontextmanager
-from typing import List, Dict, Any, Optional
+from typing import Annotated, List, Dict, Any, Optional
 
-from fastapi import FastAPI, HTTPException, Depends, BackgroundTasks
+from fastapi import FastAPI, HTTPException, Depends, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse, Response
 from pydantic import BaseModel, Field
+import cachetools
 import structlog
 
 from .config import settings
 from .orchestrator import QueryOrchestrator
 from .document_processor import DocumentProcessor
 from .workflow_engine import WorkflowEngine
+from .adapters import close_shared_client
 from .models import (
     QueryRequest, QueryResponse, QueryMode,
     DocumentProcessRequest, DocumentProcessResponse,
@@ -25,6 +28,46 @@ from .models import (
 # Configure structured logging
 logger = structlog.get_logger()
 
+# Rendered bodies of read-mostly endpoints, reused for a few seconds
+READ_CACHE_TTL = 5
+_read_cache: cachetools.TTLCache = cachetools.TTLCache(maxsize=8, ttl=READ_CACHE_TTL)
+
+
+def _cached_json(key: str) -> Optional[Response]:
+    """Fresh response for a cached body, if there is one"""
+    body = _read_cache.get(key)
+    if body is None:
+        return None
+    return Response(content=body, media_type="application/json")
+
+
+def _cache_json(key: str, content: Any) -> Response:
+    """Render content once and cache the body"""
+    response = ORJSONResponse(content)
+    _read_cache[key] = response.body
+    return response
+
+
+# Components created in lifespan, injected into handlers (async, so no threadpool hop)
+async def get_orchestrator(request: Request) -> QueryOrchestrator:
+    """Query orchestrator for this app"""
+    return request.app.state.orchestrator
+
+
+async def get_document_processor(request: Request) -> DocumentProcessor:
+    """Document processor for this app"""
+    return request.app.state.document_processor
+
+
+async def get_workflow_engine(request: Request) -> WorkflowEngine:
+    """Workflow engine for this app"""
+    return request.app.state.workflow_engine
+
+
+Orchestrator = Annotated[QueryOrchestrator, Depends(get_orchestrator)]
+Processor = Annotated[DocumentProcessor, Depends(get_document_processor)]
+Engine = Annotated[WorkflowEngine, Depends(get_workflow_engine)]
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -51,6 +94,7 @@ async def lifespan(app: FastAPI):
     await app.state.orchestrator.shutdown()
     await app.state.document_processor.shutdown()
     await app.state.workflow_engine.shutdown()
+    await close_shared_client()
 
 
 # Create FastAPI app
@@ -58,6 +102,7 @@ app = FastAPI(
     title="Unified Query Service",
     description="Orchestrates queries across Cognee, Memento, MemOS, and LlamaCloud",
     version="1.0.0",
+    default_response_class=ORJSONResponse,  # task status and results carry datetimes and vectors
     lifespan=lifespan
 )
 
@@ -73,10 +118,8 @@ app.add_middleware(
 
 # Health check endpoint
 @app.get("/health")
-async def health_check():
+async def health_check(orchestrator: Orchestrator):
     """Check health of service and all connected systems"""
-    orchestrator: QueryOrchestrator = app.state.orchestrator
-    
     health_status = await orchestrator.check_health()
     
     # Overall health is healthy if at least one system is up
@@ -86,12 +129,13 @@ async def health_check():
     if not overall_healthy:
         raise HTTPException(status_code=503, detail=health_status)
     
-    return health_status
+    # Returned as a response so FastAPI skips jsonable_encoder; probed constantly
+    return ORJSONResponse(health_status)
 
 
 # Query endpoints
 @app.post("/api/query", response_model=QueryResponse)
-async def unified_query(request: QueryRequest):
+async def unified_query(request: QueryRequest, orchestrator: Orchestrator):
     """
     Execute a query across multiple memory systems
     
@@ -101,26 +145,25 @@ async def unified_query(request: QueryRequest):
     - parallel: Query all systems, return grouped results
     - smart: Intelligently route based on query analysis
     """
-    orchestrator: QueryOrchestrator = app.state.orchestrator
-    
     try:
         result = await orchestrator.query(
             query=request.query,
             mode=request.mode,
             sources=request.sources,
-            options=request.options.dict() if request.options else {}
+            # Only non-default options: readers fall back to the same defaults, and
+            # equivalent requests share one cache key
+            options=request.options.model_dump(exclude_defaults=True) if request.options else {}
         )
-        return QueryResponse(**result)
+        # Validated once, against response_model, on the way out
+        return result
     except Exception as e:
         logger.error("Query failed", error=str(e), query=request.query)
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.post("/api/query/analyze")
-async def analyze_query(query: str):
+async def analyze_query(query: str, orchestrator: Orchestrator):
     """Analyze a query to determine optimal routing"""
-    orchestrator: QueryOrchestrator = app.state.orchestrator
-    
     analysis = await orchestrator.analyze_query(query)
     return {
         "query": query,
@@ -132,10 +175,7 @@ async def analyze_query(query: str):
 
 # Document processing endpoints
 @app.post("/api/document/process", response_model=DocumentProcessResponse)
-async def process_document(
-    request: DocumentProcessRequest,
-    background_tasks: BackgroundTasks
-):
+async def process_document(request: DocumentProcessRequest, processor: Processor):
     """
     Process a document through the configured pipeline
     
@@ -143,8 +183,6 @@ async def process_document(
     - default: Parse, chunk, embed, enrich, store
     - custom: User-defined pipeline steps
     """
-    processor: DocumentProcessor = app.state.document_processor
-    
     # Start processing in background
     task_id = await processor.start_processing(
         file_path=request.file_path,
@@ -153,24 +191,16 @@ async def process_document(
         store_in=request.store_in
     )
     
-    # Add background task to track progress
-    background_tasks.add_task(
-        processor.track_processing,
-        task_id
-    )
-    
-    return DocumentProcessResponse(
-        task_id=task_id,
-        status="processing",
-        message=f"Document processing started with {request.pipeline} pipeline"
-    )
+    return {
+        "task_id": task_id,
+        "status": "processing",
+        "message": f"Document processing started with {request.pipeline} pipeline"
+    }
 
 
 @app.get("/api/document/status/{task_id}")
-async def document_status(task_id: str):
+async def document_status(task_id: str, processor: Processor):
     """Check status of document processing task"""
-    processor: DocumentProcessor = app.state.document_processor
-    
     status = await processor.get_task_status(task_id)
     if not status:
         raise HTTPException(status_code=404, detail="Task not found")
@@ -179,10 +209,8 @@ async def document_status(task_id: str):
 
 
 @app.post("/api/document/parse")
-async def parse_document(file_path: str):
+async def parse_document(file_path: str, processor: Processor):
     """Parse a document using LlamaParse"""
-    processor: DocumentProcessor = app.state.document_processor
-    
     try:
         result = await processor.parse_document(file_path)
         return {
@@ -198,23 +226,22 @@ async def parse_document(file_path: str):
 
 # Workflow endpoints
 @app.post("/api/workflow/deploy", response_model=WorkflowDeployResponse)
-async def deploy_workflow(request: WorkflowDeployRequest):
+async def deploy_workflow(request: WorkflowDeployRequest, engine: Engine):
     """Deploy a workflow using llama_deploy"""
-    engine: WorkflowEngine = app.state.workflow_engine
-    
     try:
         deployment = await engine.deploy_workflow(
             workflow_id=request.workflow_id,
             config=request.config,
             triggers=request.triggers
         )
+        _read_cache.clear()  # workflow listings now include the new deployment
         
-        return WorkflowDeployResponse(
-            workflow_id=deployment["workflow_id"],
-            deployment_id=deployment["deployment_id"],
-            status=deployment["status"],
-            endpoints=deployment.get("endpoints", [])
-        )
+        return {
+            "workflow_id": deployment["workflow_id"],
+            "deployment_id": deployment["deployment_id"],
+            "status": deployment["status"],
+            "endpoints": deployment.get("endpoints", [])
+        }
     except Exception as e:
         logger.error("Workflow deployment failed", 
                     error=str(e), 
@@ -223,19 +250,19 @@ async def deploy_workflow(request: WorkflowDeployRequest):
 
 
 @app.get("/api/workflow/list")
-async def list_workflows():
+async def list_workflows(engine: Engine):
     """List all available workflows"""
-    engine: WorkflowEngine = app.state.workflow_engine
+    cached = _cached_json("workflows")
+    if cached is not None:
+        return cached
     
     workflows = await engine.list_workflows()
-    return {"workflows": workflows}
+    return _cache_json("workflows", {"workflows": workflows})
 
 
 @app.get("/api/workflow/status/{deployment_id}")
-async def workflow_status(deployment_id: str):
+async def workflow_status(deployment_id: str, engine: Engine):
     """Check status of deployed workflow"""
-    engine: WorkflowEngine = app.state.workflow_engine
-    
     status = await engine.get_workflow_status(deployment_id)
     if not status:
         raise HTTPException(status_code=404, detail="Deployment not found")
@@ -244,10 +271,8 @@ async def workflow_status(deployment_id: str):
 
 
 @app.post("/api/workflow/execute/{workflow_id}")
-async def execute_workflow(workflow_id: str, payload: Dict[str, Any]):
+async def execute_workflow(workflow_id: str, payload: Dict[str, Any], engine: Engine):
     """Execute a deployed workflow"""
-    engine: WorkflowEngine = app.state.workflow_engine
-    
     try:
         result = await engine.execute_workflow(workflow_id, payload)
         return {
@@ -265,35 +290,39 @@ async def execute_workflow(workflow_id: str, payload: Dict[str, Any]):
 
 # Statistics and monitoring endpoints
 @app.get("/api/stats")
-async def get_statistics():
+async def get_statistics(
+    orchestrator: Orchestrator,
+    processor: Processor,
+    engine: Engine
+):
     """Get service statistics and metrics"""
-    orchestrator: QueryOrchestrator = app.state.orchestrator
-    processor: DocumentProcessor = app.state.document_processor
-    engine: WorkflowEngine = app.state.workflow_engine
-    
     stats = {
         "query_stats": await orchestrator.get_stats(),
         "document_stats": await processor.get_stats(),
         "workflow_stats": await engine.get_stats()
     }
     
-    return stats
+    return ORJSONResponse(stats)
 
 
 @app.get("/api/config")
-async def get_configuration():
+async def get_configuration(engine: Engine):
     """Get current service configuration"""
-    return {
+    cached = _cached_json("config")
+    if cached is not None:
+        return cached
+    
+    return _cache_json("config", {
         "memory_systems": settings.MEMORY_SYSTEM_CONFIG,
         "document_processing": {
             "pipelines": settings.DOCUMENT_PIPELINES,
             "supported_formats": settings.SUPPORTED_FORMATS
         },
         "workflows": {
-            "available": await app.state.workflow_engine.list_workflows(),
+            "available": await engine.list_workflows(),
             "port_range": settings.WORKFLOW_PORT_RANGE
         }
-    }
+    })
 
 
 if __name__ == "__main__":
@@ -302,5 +331,9 @@ if __name__ == "__main__":
         "main:app",
         host="0.0.0.0",
         port=settings.SERVICE_PORT,
+        loop="uvloop",
+        http="httptools",
+        workers=1 if settings.DEBUG else settings.WORKERS,
+        access_log=settings.DEBUG,
         reload=settings.DEBUG
     )
\ No newline at end of file
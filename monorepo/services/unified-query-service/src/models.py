@@ -4,7 +4,7 @@ Data models for Unified Query Service
 
 from datetime import datetime
 from enum import Enum
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 from pydantic import BaseModel, Field
 
 
@@ -25,6 +25,10 @@ class MemorySource(str, Enum):
     LLAMACLOUD = "llamacloud"
 
 
+# Materialized once; defaults copy this rather than iterating the enum
+_ALL_SOURCES: Tuple[MemorySource, ...] = tuple(MemorySource)
+
+
 class DocumentFormat(str, Enum):
     """Supported document output formats"""
     MARKDOWN = "markdown"
@@ -88,7 +92,7 @@ class DocumentProcessRequest(BaseModel):
     file_path: str
     pipeline: str = "default"
     output_format: DocumentFormat = DocumentFormat.MARKDOWN
-    store_in: List[MemorySource] = Field(default_factory=lambda: list(MemorySource))
+    store_in: List[MemorySource] = Field(default_factory=lambda: list(_ALL_SOURCES))
     metadata: Optional[Dict[str, Any]] = None
     options: Optional[Dict[str, Any]] = None
 
@@ -8,6 +8,7 @@ from abc import ABC, abstractmethod
 from typing import List, Dict, Any, Optional
 from datetime import datetime
 
+import cachetools
 import structlog
 from tenacity import retry, stop_after_attempt, wait_exponential
 
@@ -18,10 +19,13 @@ from .adapters import (
     MemOSAdapter, LlamaCloudAdapter
 )
 from .ranking import RankingEngine
-from .cache import QueryCache
+from .cache import QueryCache, SemanticQueryCache
 
 logger = structlog.get_logger()
 
+# Distinct query strings whose routing analysis is remembered
+ANALYSIS_CACHE_SIZE = 10_000
+
 
 class QueryOrchestrator:
     """Orchestrates queries across multiple memory systems"""
@@ -30,7 +34,10 @@ class QueryOrchestrator:
         self.adapters: Dict[str, 'MemorySystemAdapter'] = {}
         self.ranking_engine = RankingEngine()
         self.cache = QueryCache()
+        self.semantic_cache: Optional[SemanticQueryCache] = None
         self.stats = QueryStats()
+        # Analysis is a pure function of the query text; results are shared, read-only
+        self._analysis_cache: cachetools.LRUCache = cachetools.LRUCache(maxsize=ANALYSIS_CACHE_SIZE)
         self._initialized = False
     
     async def initialize(self):
@@ -50,6 +57,15 @@ class QueryOrchestrator:
         if "llamacloud" in settings.ENABLED_MEMORY_SYSTEMS:
             self.adapters["llamacloud"] = LlamaCloudAdapter(settings.LLAMACLOUD_URL)
         
+        # Paraphrase-tolerant cache tier, when an embedding model is configured
+        if settings.OPENAI_API_KEY:
+            # Imported here so the orchestrator loads without llama_index installed
+            from llama_index.embeddings.openai import OpenAIEmbedding
+            self.semantic_cache = SemanticQueryCache(
+                self.cache,
+                OpenAIEmbedding(api_key=settings.OPENAI_API_KEY)
+            )
+        
         # Initialize all adapters
         init_tasks = [adapter.initialize() for adapter in self.adapters.values()]
         await asyncio.gather(*init_tasks)
@@ -79,13 +95,37 @@ class QueryOrchestrator:
         """
         start_time = time.time()
         
-        # Check cache first
-        cache_key = self._generate_cache_key(query, mode, sources, options)
-        cached_result = await self.cache.get(cache_key)
+        # Check cache first: exact key, then semantically similar queries
+        cache_scope = self._generate_cache_scope(mode, sources, options)
+        cache_key = f"{query}:{cache_scope}"
+        cached_result = self.cache.get_local(cache_key)
+        if cached_result is None:
+            cached_result = await self.cache.get(cache_key)
+        if not cached_result and self.semantic_cache:
+            cached_result = await self.semantic_cache.get(query, cache_scope)
         if cached_result:
             self.stats.cache_hit_rate += 1
             return cached_result
         
+        # Concurrent misses on the same key share one fan-out
+        return await self.cache.get_or_compute(
+            cache_key,
+            lambda: self._execute_query(
+                query, mode, sources, options, cache_key, cache_scope, start_time
+            )
+        )
+    
+    async def _execute_query(
+        self,
+        query: str,
+        mode: QueryMode,
+        sources: Optional[List[str]],
+        options: Optional[Dict[str, Any]],
+        cache_key: str,
+        cache_scope: str,
+        start_time: float
+    ) -> Dict[str, Any]:
+        """Run a query against the memory systems (result is cached by the caller)"""
         # Determine which sources to query
         if not sources:
             sources = list(self.adapters.keys())
@@ -120,8 +160,9 @@ class QueryOrchestrator:
             }
         }
         
-        # Cache the result
-        await self.cache.set(cache_key, response)
+        # Index for paraphrase lookups; the entry itself is stored by get_or_compute
+        if self.semantic_cache:
+            await self.semantic_cache.add(query, cache_scope, cache_key)
         
         # Update statistics
         self._update_stats(mode, sources, time.time() - start_time)
@@ -258,23 +299,49 @@ class QueryOrchestrator:
             
             return results
     
-    @retry(
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=2, max=10)
-    )
     async def _query_single_source(
         self,
         source: str,
         query: str,
         options: Dict[str, Any]
     ) -> List[QueryResult]:
-        """Query a single memory source with retry logic"""
+        """Query a single memory source, skipping it if it recently had nothing"""
         adapter = self.adapters.get(source)
         if not adapter:
             logger.warning("Unknown source", source=source)
             return []
         
         config = settings.MEMORY_SYSTEM_CONFIG.get(source, {})
+        
+        # Skip backends that just failed or came back empty for this query
+        negative_key = self._negative_cache_key(source, query, options)
+        if adapter.circuit_open or await self.cache.get_negative(negative_key):
+            return []
+        
+        try:
+            results = await self._search_source(adapter, source, query, options, config)
+        except Exception:
+            # Retries are exhausted
+            await self._remember_negative(negative_key, config)
+            raise
+        
+        if not results:
+            await self._remember_negative(negative_key, config)
+        return results
+    
+    @retry(
+        stop=stop_after_attempt(3),
+        wait=wait_exponential(multiplier=1, min=2, max=10)
+    )
+    async def _search_source(
+        self,
+        adapter,
+        source: str,
+        query: str,
+        options: Dict[str, Any],
+        config: Dict[str, Any]
+    ) -> List[QueryResult]:
+        """Search one backend with retry logic"""
         timeout = config.get("timeout", 5.0)
         
         try:
@@ -284,20 +351,20 @@ class QueryOrchestrator:
                 timeout=timeout
             )
             
-            # Convert to QueryResult objects
-            query_results = []
-            for result in results:
-                query_results.append(QueryResult(
+            # Convert to QueryResult objects, stamped with one retrieval time
+            retrieved_at = datetime.utcnow()
+            return [
+                QueryResult(
                     id=result.get("id", ""),
                     content=result.get("content", ""),
                     source=source,
                     score=result.get("score", 0.0),
                     metadata=result.get("metadata", {}),
-                    timestamp=datetime.utcnow(),
+                    timestamp=retrieved_at,
                     highlights=result.get("highlights")
-                ))
-            
-            return query_results
+                )
+                for result in results
+            ]
             
         except asyncio.TimeoutError:
             logger.error("Query timeout", source=source, timeout=timeout)
@@ -306,6 +373,20 @@ class QueryOrchestrator:
             logger.error("Query failed", source=source, error=str(e))
             raise
     
+    def _negative_cache_key(
+        self,
+        source: str,
+        query: str,
+        options: Optional[Dict[str, Any]]
+    ) -> str:
+        """Cache key marking a source as having nothing for this query"""
+        options_str = str(sorted(options.items())) if options else ""
+        return f"negative:{source}:{query}:{options_str}"
+    
+    async def _remember_negative(self, key: str, config: Dict[str, Any]):
+        """Briefly cache an empty search, or one that failed every retry, so repeats skip the backend"""
+        await self.cache.set_negative(key, ttl=config.get("negative_ttl", 10))
+    
     async def _process_results(
         self,
         results: List[QueryResult],
@@ -402,6 +483,13 @@ class QueryOrchestrator:
     
     async def analyze_query(self, query: str) -> Dict[str, Any]:
         """Analyze query to determine optimal routing"""
+        analysis = self._analysis_cache.get(query)
+        if analysis is None:
+            analysis = self._analysis_cache[query] = self._analyze_query(query)
+        return analysis
+    
+    def _analyze_query(self, query: str) -> Dict[str, Any]:
+        """Rule-based routing analysis of a query"""
         analysis = {
             "query_type": "general",
             "complexity": "simple",
@@ -485,26 +573,10 @@ class QueryOrchestrator:
     
     async def check_health(self) -> Dict[str, Any]:
         """Check health of all memory systems"""
-        health_checks = []
-        
-        for name, adapter in self.adapters.items():
-            start_time = time.time()
-            try:
-                is_healthy = await adapter.health_check()
-                health_checks.append({
-                    "name": name,
-                    "status": "healthy" if is_healthy else "unhealthy",
-                    "latency": time.time() - start_time,
-                    "last_check": datetime.utcnow().isoformat()
-                })
-            except Exception as e:
-                health_checks.append({
-                    "name": name,
-                    "status": "error",
-                    "latency": time.time() - start_time,
-                    "last_check": datetime.utcnow().isoformat(),
-                    "error": str(e)
-                })
+        health_checks = await asyncio.gather(*(
+            self._check_adapter_health(name, adapter)
+            for name, adapter in self.adapters.items()
+        ))
         
         # Overall status
         healthy_count = sum(1 for h in health_checks if h["status"] == "healthy")
@@ -519,17 +591,38 @@ class QueryOrchestrator:
             "total_systems": len(health_checks)
         }
     
-    def _generate_cache_key(
+    async def _check_adapter_health(self, name: str, adapter) -> Dict[str, Any]:
+        """Probe one memory system and report status and latency"""
+        start_time = time.time()
+        try:
+            is_healthy = adapter.cached_health
+            if is_healthy is None:
+                is_healthy = await adapter.health_check()
+            return {
+                "name": name,
+                "status": "healthy" if is_healthy else "unhealthy",
+                "latency": time.time() - start_time,
+                "last_check": datetime.utcnow().isoformat()
+            }
+        except Exception as e:
+            return {
+                "name": name,
+                "status": "error",
+                "latency": time.time() - start_time,
+                "last_check": datetime.utcnow().isoformat(),
+                "error": str(e)
+            }
+    
+    def _generate_cache_scope(
         self,
-        query: str,
         mode: QueryMode,
         sources: Optional[List[str]],
         options: Optional[Dict[str, Any]]
     ) -> str:
-        """Generate cache key for query"""
+        """Generate the query-independent part of the cache key"""
         sources_str = ",".join(sorted(sources or []))
         options_str = str(sorted(options.items())) if options else ""
-        return f"{query}:{mode}:{sources_str}:{options_str}"
+        return f"{mode}:{sources_str}:{options_str}"
     
     def _update_stats(
         self,
@@ -540,14 +633,16 @@ class QueryOrchestrator:
         """Update query statistics"""
         self.stats.total_queries += 1
         
-        # Update mode counts
-        self.stats.queries_by_mode[mode] = \
-            self.stats.queries_by_mode.get(mode, 0) + 1
+        # Update mode counts (plain string keys, so stats stay JSON-serializable)
+        mode_key = getattr(mode, "value", mode)
+        self.stats.queries_by_mode[mode_key] = \
+            self.stats.queries_by_mode.get(mode_key, 0) + 1
         
         # Update source counts
         for source in sources:
-            self.stats.queries_by_source[source] = \
-                self.stats.queries_by_source.get(source, 0) + 1
+            source_key = getattr(source, "value", source)
+            self.stats.queries_by_source[source_key] = \
+                self.stats.queries_by_source.get(source_key, 0) + 1
         
         # Update average latency (simple moving average)
         self.stats.average_latency = (
@@ -557,4 +652,4 @@ class QueryOrchestrator:
     
     async def get_stats(self) -> Dict[str, Any]:
         """Get query statistics"""
-        return self.stats.dict()
\ No newline at end of file
+        return self.stats.model_dump(mode="json")
\ No newline at end of file
@@ -4,10 +4,23 @@ Ranking Engine - Ranks and scores query results
 
 from typing import List, Dict, Any
 from datetime import datetime
-import math
+
+import numpy as np
 
 from .models import QueryResult, RankingStrategy
 
+# Trust score per source; unknown sources get DEFAULT_SOURCE_TRUST
+SOURCE_TRUST = {
+    "cognee": 0.9,      # High trust for semantic graph
+    "llamacloud": 0.85, # High trust for indexed documents
+    "memos": 0.8,       # Good trust for structured memory
+    "memento": 0.7      # Moderate trust for key-value
+}
+DEFAULT_SOURCE_TRUST = 0.5
+
+# Recency decays with a one-week time constant
+RECENCY_DECAY_HOURS = 168
+
 
 class RankingEngine:
     """Ranks query results based on various strategies"""
@@ -51,33 +64,36 @@ class RankingEngine:
         weights: Dict[str, float]
     ) -> List[QueryResult]:
         """Hybrid ranking combining multiple factors"""
-        # Calculate composite scores
-        for result in results:
-            # Base relevance score
-            relevance_score = result.score * weights["relevance"]
-            
-            # Recency score (decay over time)
-            age_hours = (datetime.utcnow() - result.timestamp).total_seconds() / 3600
-            recency_score = math.exp(-age_hours / 168) * weights["recency"]  # Weekly decay
-            
-            # Source trust score
-            source_trust = self._get_source_trust(result.source)
-            trust_score = source_trust * weights["source_trust"]
-            
-            # User preference score (would be personalized in production)
-            preference_score = 0.5 * weights["user_preference"]
-            
-            # Composite score
-            result.score = relevance_score + recency_score + trust_score + preference_score
+        # One column per factor, so the composite is a single matrix-vector product
+        scores = np.fromiter((r.score for r in results), dtype=np.float64, count=len(results))
+        timestamps = np.array([r.timestamp for r in results], dtype="datetime64[us]")
+        age_hours = (np.datetime64(datetime.utcnow(), "us") - timestamps) / np.timedelta64(1, "h")
+        recency = np.exp(-age_hours / RECENCY_DECAY_HOURS)
+        trust = np.fromiter(
+            (self._get_source_trust(r.source) for r in results),
+            dtype=np.float64, count=len(results)
+        )
+        # User preference (would be personalized in production)
+        preference = np.full(len(results), 0.5)
         
-        return sorted(results, key=lambda r: r.score, reverse=True)
+        w = np.array([
+            weights["relevance"],
+            weights["recency"],
+            weights["source_trust"],
+            weights["user_preference"]
+        ])
+        composite = w @ np.stack([scores, recency, trust, preference])
+        
+        # Stable descending sort, matching sorted(..., reverse=True)
+        order = np.argsort(-composite, kind="stable")
+        ranked = []
+        for i in order.tolist():
+            result = results[i]
+            result.score = float(composite[i])
+            ranked.append(result)
+        
+        return ranked
     
     def _get_source_trust(self, source: str) -> float:
         """Get trust score for source"""
-        trust_scores = {
-            "cognee": 0.9,      # High trust for semantic graph
-            "llamacloud": 0.85, # High trust for indexed documents
-            "memos": 0.8,       # Good trust for structured memory
-            "memento": 0.7      # Moderate trust for key-value
-        }
-        return trust_scores.get(source, 0.5)
\ No newline at end of file
+        return SOURCE_TRUST.get(source, DEFAULT_SOURCE_TRUST)
\ No newline at end of file
@@ -237,7 +237,7 @@ class WorkflowEngine:
                 "triggers": len(deployment["triggers"]),
                 "uptime": (datetime.utcnow() - deployment["created_at"]).total_seconds()
             }
-        ).dict()
+        ).model_dump()
     
     async def list_workflows(self) -> List[Dict[str, Any]]:
         """List available workflows"""
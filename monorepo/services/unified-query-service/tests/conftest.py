@@ -0,0 +1,10 @@
+"""
+Pytest configuration for Unified Query Service testing.
+"""
+
+import os
+
+# Required settings, and no Redis: the query cache falls back to its in-process store
+os.environ.setdefault("LLAMA_INDEX_API_KEY", "test-key")
+os.environ.setdefault("JWT_SECRET", "test-secret")
+os.environ["REDIS_URL"] = ""
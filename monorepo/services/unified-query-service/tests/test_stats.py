@@ -0,0 +1,37 @@
+"""
+Statistics endpoint tests.
+"""
+
+from fastapi.testclient import TestClient
+
+from src.main import app, get_document_processor, get_orchestrator, get_workflow_engine
+from src.orchestrator import QueryOrchestrator
+
+
+class _StubStats:
+    """Component stand-in that only reports empty stats"""
+    
+    async def get_stats(self):
+        return {}
+
+
+def test_stats_after_query():
+    """Mode and source counters keyed by enums must still serialize"""
+    orchestrator = QueryOrchestrator()
+    stub = _StubStats()
+    app.dependency_overrides[get_orchestrator] = lambda: orchestrator
+    app.dependency_overrides[get_document_processor] = lambda: stub
+    app.dependency_overrides[get_workflow_engine] = lambda: stub
+    try:
+        client = TestClient(app)
+        
+        response = client.post("/api/query", json={"query": "what changed", "mode": "unified"})
+        assert response.status_code == 200
+        
+        response = client.get("/api/stats")
+        assert response.status_code == 200
+        query_stats = response.json()["query_stats"]
+        assert query_stats["total_queries"] == 1
+        assert query_stats["queries_by_mode"] == {"unified": 1}
+    finally:
+        app.dependency_overrides.clear()